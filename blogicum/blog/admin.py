@@ -1,24 +1,111 @@
+from django import forms
+from django.forms.models import ModelChoiceIterator
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
 
-from .models import Category, Location, Post, Comment
+from .cascade import cascade_deletion
+from .constants import ADMIN_COUNT_LIMIT
+from .models import Category, Location, Post, Comment, User
+from .search import filter_by_terms, filter_prefix
+from .utils import CachedCountPaginator
+
+
+class AdminPaginator(CachedCountPaginator):
+    """Paginator that stops counting changelist rows at a limit."""
+
+    estimate_limit = ADMIN_COUNT_LIMIT
+
+
+class SharedChoices:
+    """Choices of a model choice field fetched once and shared by copies."""
+
+    def __init__(self, field):
+        self.field = field
+        self.choices = None
+
+    def __iter__(self):
+        if self.choices is None:
+            self.choices = list(ModelChoiceIterator(self.field))
+        return iter(self.choices)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class SharedChoicesField(forms.ModelChoiceField):
+    """
+    Model choice field that queries its choices once for all copies.
+    Changelist forms copy the field for each row of list_editable.
+    """
+
+    def _get_choices(self):
+        if getattr(self, '_shared_choices', None) is None:
+            self._shared_choices = SharedChoices(self)
+        return self._shared_choices
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+
+class IndexedSearchAdmin(admin.ModelAdmin):
+    """Admin that searches through the token index and bounds counts."""
+
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return AdminPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            estimate=True
+        )
+
+    def is_changelist(self, request):
+        opts = self.model._meta
+        return request.resolver_match.url_name == (
+            f'{opts.app_label}_{opts.model_name}_changelist')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if (db_field.name in self.list_editable
+                and self.is_changelist(request)):
+            kwargs.setdefault('widget', forms.Select)
+            kwargs.setdefault('form_class', SharedChoicesField)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_by_terms(queryset, search_term), False
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(IndexedSearchAdmin):
     list_display = (
         'id', 'title', 'author', 'text', 'category', 'pub_date',
         'location', 'created_at', 'is_published'
     )
     list_display_links = ('title',)
+    list_select_related = ('author', 'category', 'location')
+    autocomplete_fields = ('author', 'category', 'location')
     list_editable = ('category', 'is_published', 'location')
     list_filter = ('is_published',)
     search_fields = ('title', 'text')
     empty_value_display = '-пусто-'
 
+    def delete_queryset(self, request, queryset):
+        with cascade_deletion(
+            ('post', pk) for pk in queryset.values_list('pk', flat=True)
+        ):
+            super().delete_queryset(request, queryset)
+
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(IndexedSearchAdmin):
     list_display = (
         'id', 'title', 'description', 'slug', 'is_published', 'created_at'
     )
@@ -29,7 +116,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(IndexedSearchAdmin):
     list_display = (
         'id', 'name', 'is_published', 'created_at'
     )
@@ -40,13 +127,46 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchAdmin):
     list_display = (
         'id', 'author', 'text', 'post', 'created_at'
     )
     list_display_links = ('text',)
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
     search_fields = ('text',)
     empty_value_display = '-пусто-'
 
 
+def get_user_deletion_keys(user_ids):
+    """Get cascade keys of the users and of their posts."""
+    return [
+        *(('user', pk) for pk in user_ids),
+        *(('post', pk) for pk in Post.objects.filter(
+            author_id__in=user_ids).values_list('pk', flat=True)),
+    ]
+
+
+class UserAdmin(BaseUserAdmin):
+    """User admin that looks users up by an indexed username prefix."""
+
+    show_full_result_count = False
+
+    def delete_model(self, request, obj):
+        with cascade_deletion(get_user_deletion_keys([obj.pk])):
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
+        with cascade_deletion(get_user_deletion_keys(user_ids)):
+            super().delete_queryset(request, queryset)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_prefix(queryset, 'username', search_term), False
+
+
 admin.site.unregister(Group)
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
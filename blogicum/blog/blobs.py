@@ -0,0 +1,28 @@
+"""Reference counting of stored post images."""
+from django.db.models import F
+
+from jobs.queue import enqueue
+
+from .constants import MEDIA_GC_DELAY
+from .models import MediaBlob
+from .tasks import collect_blob
+
+
+def retain_blob(name: str):
+    """Count one more reference to the stored file."""
+    _, created = MediaBlob.objects.get_or_create(
+        name=name, defaults={'references': 1})
+    if not created:
+        MediaBlob.objects.filter(name=name).update(
+            references=F('references') + 1)
+
+
+def release_blob(name: str):
+    """
+    Count one reference less to the stored file. Files left without
+    references are collected after a delay, in case they are uploaded again.
+    """
+    MediaBlob.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1)
+    if MediaBlob.objects.filter(name=name, references=0).exists():
+        enqueue(collect_blob, name, delay=MEDIA_GC_DELAY)
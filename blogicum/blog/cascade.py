@@ -0,0 +1,27 @@
+"""Deletion of posts and users together with their comments."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Posts and users being deleted, as ('post', pk) and ('user', pk). Their
+# comments are deleted in a cascade and skip the per-comment receivers.
+deleting = ContextVar('deleting', default=frozenset())
+
+
+@contextmanager
+def cascade_deletion(keys):
+    """
+    Mark the posts and users as being deleted until the block exits,
+    whether the deletion succeeds or fails.
+    """
+    token = deleting.set(deleting.get() | frozenset(keys))
+    try:
+        yield
+    finally:
+        deleting.reset(token)
+
+
+def is_cascaded(comment) -> bool:
+    """Whether the comment is deleted along with its post or author."""
+    flagged = deleting.get()
+    return (('post', comment.post_id) in flagged
+            or ('user', comment.author_id) in flagged)
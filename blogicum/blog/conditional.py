@@ -0,0 +1,126 @@
+"""Conditional GET support for blog pages."""
+from functools import wraps
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.timezone import now
+
+from blogicum.db_router import read_from_primary_while_pinned
+
+from .models import Post, User
+from .utils import get_feed_last_modified
+
+
+def _latest(*timestamps):
+    return max(timestamp for timestamp in timestamps if timestamp is not None)
+
+
+def index_last_modified(request):
+    """Get the last change of the index feed."""
+    return _latest(
+        get_feed_last_modified('index'),
+        Post.published_objects.values_list('pub_date', flat=True).first()
+    )
+
+
+def category_last_modified(request, category_slug: str):
+    """Get the last change of the category feed."""
+    posts = Post.published_objects.filter(category__slug=category_slug)
+    category_id = posts.values_list('category_id', flat=True).first()
+    if category_id is None:
+        return None
+    return _latest(
+        get_feed_last_modified('category', category_id),
+        posts.values_list('pub_date', flat=True).first()
+    )
+
+
+def profile_last_modified(request, username: str):
+    """Get the last change of the user profile feed."""
+    user_id = User.objects.filter(
+        username=username).values_list('pk', flat=True).first()
+    if user_id is None:
+        return None
+    if request.user.pk == user_id:
+        return get_feed_last_modified('author_all', user_id)
+    return _latest(
+        get_feed_last_modified('author', user_id),
+        Post.published_objects.filter(
+            author_id=user_id).values_list('pub_date', flat=True).first()
+    )
+
+
+def post_last_modified(request, post_id: int):
+    """Get the last change of the post, its comments or its visibility."""
+    post = Post.objects.filter(pk=post_id).values(
+        'updated_at', 'pub_date').first()
+    if post is None:
+        return None
+    return _latest(
+        post['updated_at'],
+        post['pub_date'] if post['pub_date'] <= now() else None
+    )
+
+
+def get_etag(request, last_modified) -> str:
+    """Get ETag of the page version as seen by the client."""
+    session = getattr(request, 'session', None)
+    return quote_etag(md5(':'.join((
+        last_modified.isoformat(),
+        str(request.user.pk),
+        request.META.get('CSRF_COOKIE', ''),
+        getattr(session, 'session_key', None) or '',
+    )).encode()).hexdigest())
+
+
+def after_render(response, callback):
+    """Call back with the response once its content is rendered."""
+    if callable(getattr(response, 'render', None)) and not (
+            response.is_rendered):
+        response.add_post_render_callback(callback)
+    else:
+        callback(response)
+
+
+def conditional_page(last_modified_func):
+    """
+    Answer 304 Not Modified when the page did not change since the last
+    request. The ETag also depends on the user since pages differ for
+    authors, readers and anonymous visitors, and on the CSRF cookie and
+    the session since forms on the pages embed a token tied to them. The
+    response gets the ETag for the token the view rendered.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            with read_from_primary_while_pinned():
+                last_modified = last_modified_func(request, *args, **kwargs)
+            if last_modified is None:
+                return view(request, *args, **kwargs)
+            modified = last_modified
+            if request.user.is_authenticated:
+                last_modified = None
+            else:
+                last_modified = int(last_modified.timestamp())
+            response = get_conditional_response(
+                request, etag=get_etag(request, modified),
+                last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+
+            def set_validators(response):
+                if response.status_code in (200, 304):
+                    response['ETag'] = get_etag(request, modified)
+                    if last_modified is not None:
+                        response['Last-Modified'] = http_date(last_modified)
+
+            after_render(response, set_validators)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,27 @@
 MAX_FIELD_LENGTH = 256
 REPRESENTATION_LENGTH = 20
 QUERIES_PER_PAGE = 10
+PAGES_ON_EACH_SIDE = 3
+PAGES_ON_ENDS = 1
+FEED_COUNT_CACHE_TIMEOUT = 60
+COUNT_ESTIMATE_LIMIT = QUERIES_PER_PAGE * 100
+PAGE_CACHE_TIMEOUT = 60 * 5
+PURGE_CHUNK_SIZE = 500
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+COMMENTS_PER_PAGE = 20
+MAX_TERM_LENGTH = 64
+SEARCH_TITLE_WEIGHT = 3
+SEARCH_STATS_CACHE_TIMEOUT = 60 * 5
+SNIPPET_WORDS = 30
+BM25_K1 = 1.2
+BM25_B = 0.75
+ADMIN_COUNT_LIMIT = 10000
+RENDITION_WIDTHS = {'card': 640, 'detail': 1280}
+IMAGE_QUALITY = 85
+MAX_SIZE_LENGTH = 16
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40 * 1000 * 1000
+MEDIA_GC_DELAY = 60 * 60
+WRITE_BATCH_SIZE = 50
+WRITE_BATCH_DELAY = 0.005
+WRITE_TIMEOUT = 30
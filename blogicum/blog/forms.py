@@ -1,9 +1,63 @@
 from django import forms
+from django.core.exceptions import ValidationError
 from django.utils import timezone
+from PIL import Image
 
+from .constants import MAX_IMAGE_BYTES, MAX_IMAGE_PIXELS
 from .models import Post, Comment, User
 
 
+class BoundedImageField(forms.ImageField):
+    """
+    Image field that checks the file size and the pixel count from the
+    image header before Pillow verifies the whole file.
+    """
+
+    default_error_messages = {
+        'too_large': 'Размер файла не должен превышать %(limit)s МБ.',
+        'too_many_pixels': ('Изображение не должно быть больше '
+                            '%(limit)s мегапикселей.'),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        error = getattr(data, 'upload_error', None)
+        if error is None and data.size > MAX_IMAGE_BYTES:
+            error = 'too_large'
+        if error is None:
+            error = self.check_pixels(data)
+        if error:
+            raise ValidationError(
+                self.error_messages[error],
+                code=error,
+                params={'limit': {
+                    'too_large': MAX_IMAGE_BYTES // (1024 * 1024),
+                    'too_many_pixels': MAX_IMAGE_PIXELS // (1000 * 1000),
+                }.get(error)}
+            )
+        return super().to_python(data)
+
+    @staticmethod
+    def check_pixels(data):
+        """Read the image size from its header without decoding it."""
+        if hasattr(data, 'temporary_file_path'):
+            source = data.temporary_file_path()
+        else:
+            source = data
+        try:
+            with Image.open(source) as image:
+                width, height = image.size
+        except Exception:
+            return 'invalid_image'
+        finally:
+            if hasattr(data, 'seek'):
+                data.seek(0)
+        if width * height > MAX_IMAGE_PIXELS:
+            return 'too_many_pixels'
+        return None
+
+
 class PostForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
@@ -15,6 +69,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('title', 'text', 'pub_date', 'location', 'category', 'image')
+        field_classes = {'image': BoundedImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(
                 format='%Y-%m-%dT%H:%M',
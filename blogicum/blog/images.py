@@ -0,0 +1,86 @@
+"""
+Fixed-size renditions of post images. Renditions are kept in the default
+storage next to the original under the original's name.
+"""
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .constants import IMAGE_QUALITY, RENDITION_WIDTHS
+
+FORMATS = {'jpg': 'JPEG', 'webp': 'WEBP'}
+
+
+def get_rendition_name(name: str, rendition: str, extension: str) -> str:
+    """Get storage name of the rendition stored next to the original."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}.{rendition}.{extension}'))
+
+
+def get_rendition_names(name: str):
+    """Get storage names of all renditions of the original."""
+    return [
+        get_rendition_name(name, rendition, extension)
+        for rendition in RENDITION_WIDTHS
+        for extension in FORMATS
+    ]
+
+
+def get_rendition_size(width: int, height: int, rendition: str):
+    """Get size of the rendition keeping the original aspect ratio."""
+    target = min(RENDITION_WIDTHS[rendition], width)
+    return target, max(round(height * target / width), 1)
+
+
+def format_size(width: int, height: int) -> str:
+    """Format image size as WIDTHxHEIGHT."""
+    return f'{width}x{height}'
+
+
+def parse_size(size: str):
+    """Parse WIDTHxHEIGHT into (width, height), None if it is malformed."""
+    try:
+        width, height = map(int, size.split('x'))
+    except ValueError:
+        return None
+    if width <= 0 or height <= 0:
+        return None
+    return width, height
+
+
+def make_renditions(image):
+    """
+    Save card and detail renditions of the image in JPEG and WebP.
+    Return size of the original as WIDTHxHEIGHT.
+    """
+    image.open('rb')
+    try:
+        with Image.open(image) as original:
+            # Let JPEG decode at a reduced scale that still covers the
+            # largest rendition instead of materializing the full bitmap.
+            largest = max(RENDITION_WIDTHS.values())
+            original.draft('RGB', (largest, largest))
+            original = ImageOps.exif_transpose(original).convert('RGB')
+    finally:
+        image.close()
+    for rendition in RENDITION_WIDTHS:
+        resized = original.resize(
+            get_rendition_size(*original.size, rendition),
+            Image.LANCZOS
+        )
+        for extension, image_format in FORMATS.items():
+            name = get_rendition_name(image.name, rendition, extension)
+            content = BytesIO()
+            resized.save(content, image_format, quality=IMAGE_QUALITY)
+            default_storage.delete(name)
+            default_storage.save(name, ContentFile(content.getvalue()))
+    return format_size(*original.size)
+
+
+def delete_renditions(name: str):
+    """Delete renditions of the original with the name."""
+    for rendition_name in get_rendition_names(name):
+        default_storage.delete(rendition_name)
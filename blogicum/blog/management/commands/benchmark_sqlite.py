@@ -0,0 +1,121 @@
+"""Compare SQLite throughput with default settings and SQLITE_PRAGMAS."""
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blogicum.sqlite import get_pragma_statements
+
+# Python's sqlite3 and so Django wait this long for a lock by default.
+DEFAULT_TIMEOUT = 5
+POSTS = 100
+SCHEMA = '''
+CREATE TABLE comment (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX comment_post_created_idx ON comment (post_id, created_at);
+'''
+TEXT = 'Комментарий к публикации. ' * 10
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(
+        path, timeout=DEFAULT_TIMEOUT, isolation_level=None)
+    for statement in get_pragma_statements(pragmas):
+        connection.execute(statement)
+    return connection
+
+
+def create_database(path, pragmas, rows):
+    connection = connect(path, pragmas)
+    connection.executescript(SCHEMA)
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO comment (post_id, text, created_at) VALUES (?, ?, ?)',
+        ((row % POSTS, TEXT, time.time()) for row in range(rows))
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def run_client(path, pragmas, writer, seconds, number):
+    """Write or read comments for the given time, return (done, errors)."""
+    connection = connect(path, pragmas)
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        post_id = (number + done) % POSTS
+        try:
+            if writer:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(
+                    'INSERT INTO comment (post_id, text, created_at) '
+                    'VALUES (?, ?, ?)', (post_id, TEXT, time.time()))
+                connection.execute('COMMIT')
+            else:
+                connection.execute(
+                    'SELECT id, text FROM comment WHERE post_id = ? '
+                    'ORDER BY created_at DESC LIMIT 20', (post_id,)
+                ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+    connection.close()
+    return done, errors
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite с настройками по '
+            'умолчанию и с профилем SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4,
+                            help='Число читающих процессов.')
+        parser.add_argument('--writers', type=int, default=4,
+                            help='Число пишущих процессов.')
+        parser.add_argument('--seconds', type=float, default=5,
+                            help='Длительность замера каждого профиля.')
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Число комментариев в базе перед замером.')
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('по умолчанию', {}),
+            ('SQLITE_PRAGMAS', getattr(settings, 'SQLITE_PRAGMAS', {})),
+        )
+        self.stdout.write(
+            f'{"профиль":<16}{"чтений/с":>12}{"записей/с":>12}'
+            f'{"ошибок":>10}')
+        for name, pragmas in profiles:
+            reads, writes, errors = self.measure(pragmas, options)
+            self.stdout.write(
+                f'{name:<16}{reads:>12.0f}{writes:>12.0f}{errors:>10}')
+
+    def measure(self, pragmas, options):
+        seconds = options['seconds']
+        roles = [False] * options['readers'] + [True] * options['writers']
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'benchmark.sqlite3')
+            create_database(path, pragmas, options['rows'])
+            with ProcessPoolExecutor(len(roles)) as pool:
+                futures = [
+                    pool.submit(
+                        run_client, path, pragmas, writer, seconds, number)
+                    for number, writer in enumerate(roles)
+                ]
+                results = [future.result() for future in futures]
+        reads = sum(done for (done, _), writer in zip(results, roles)
+                    if not writer)
+        writes = sum(done for (done, _), writer in zip(results, roles)
+                     if writer)
+        errors = sum(error for _, error in results)
+        return reads / seconds, writes / seconds, errors
@@ -0,0 +1,228 @@
+"""Stream blog objects from a large JSON or NDJSON dump into the database."""
+import gzip
+import json
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+from time import monotonic
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.utils.text import capfirst
+from django.utils.timezone import now
+
+from blog.models import Category, Comment, Location, MediaBlob, Post, User
+from blog.page_cache import purge_all_pages
+from blog.utils import get_feeds, invalidate_feeds
+
+BATCH_SIZE = 1000
+BATCHES_PER_TRANSACTION = 10
+READ_SIZE = 64 * 1024
+# Models in the order their foreign keys depend on each other
+MODELS = (Category, Location, User, Post, Comment)
+SEPARATORS = ' \t\r\n[],'
+
+
+def iter_records(stream, read_size: int = READ_SIZE):
+    """
+    Decode objects one by one from a JSON array or from NDJSON, holding
+    only the object being read in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            buffer, position = stream.read(read_size), 0
+            eof = not buffer
+            continue
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            if eof:
+                raise CommandError(f'Некорректный JSON: {error}')
+            chunk = stream.read(read_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        if not isinstance(record, dict):
+            raise CommandError(f'Ожидался объект, получено: {record!r}')
+        yield record
+
+
+@contextmanager
+def dump_timestamps(model):
+    """
+    Turn off auto_now and auto_now_add of the model while inserting, so
+    the dates of the dump are kept as by loaddata. Yields these fields.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def open_dump(path: str):
+    """Open the dump as text, unpacking it when it ends with .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8-sig')
+    return open(path, encoding='utf-8-sig')
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает категории, местоположения, пользователей, '
+            'публикации и комментарии из JSON или NDJSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл дампа в JSON или NDJSON, можно сжатый .gz.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество объектов в одном bulk_create.'
+        )
+        parser.add_argument(
+            '--batches-per-transaction', type=int,
+            default=BATCHES_PER_TRANSACTION,
+            help='Количество пакетов, сохраняемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать объекты, которые уже есть в базе.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.ignore_conflicts = options['ignore_conflicts']
+        if self.batch_size < 1 or options['batches_per_transaction'] < 1:
+            raise CommandError('Размеры пакетов должны быть положительными.')
+        self.chunk_size = self.batch_size * options['batches_per_transaction']
+        self.saved = Counter()
+        self.started = monotonic()
+        # One pass over the dump per model, so every object is saved after
+        # the objects it refers to, whatever the order of the dump.
+        for model in MODELS:
+            try:
+                self.load(model, options['path'])
+            except OSError as error:
+                raise CommandError(error)
+        self.finish()
+
+    def load(self, model, path: str):
+        """Save objects of the model from the dump in chunked transactions."""
+        label = model._meta.label_lower
+        with open_dump(path) as stream:
+            objects = Deserializer((
+                record for record in iter_records(stream)
+                if record.get('model') == label
+            ), ignorenonexistent=True)
+            try:
+                while chunk := list(islice(objects, self.chunk_size)):
+                    with transaction.atomic():
+                        self.save_chunk(model, chunk)
+                    self.report()
+            except DeserializationError as error:
+                raise CommandError(error)
+            except IntegrityError as error:
+                raise CommandError(
+                    f'{label}: {error}. Уже загруженные объекты можно '
+                    'пропустить с --ignore-conflicts.')
+
+    def save_chunk(self, model, chunk):
+        """Save objects of the chunk with one bulk_create per batch."""
+        for start in range(0, len(chunk), self.batch_size):
+            instances = [
+                deserialized.object
+                for deserialized in chunk[start:start + self.batch_size]
+            ]
+            with dump_timestamps(model) as fields:
+                # Dates missing from the dump are set as on save
+                stamp = now()
+                for instance in instances:
+                    for field in fields:
+                        if getattr(instance, field.attname) is None:
+                            setattr(instance, field.attname, stamp)
+                model.objects.bulk_create(
+                    instances, ignore_conflicts=self.ignore_conflicts)
+            self.saved[model] += len(instances)
+
+    def report(self):
+        total = sum(self.saved.values())
+        rate = total / max(monotonic() - self.started, 1e-6)
+        self.stdout.write(
+            f'Загружено объектов: {total} ({rate:.0f} в секунду)')
+
+    def finish(self):
+        """Move sequences past loaded keys and rebuild derived data."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [model for model in MODELS if self.saved[model]])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        if self.saved[Post]:
+            self.recount_blobs()
+        if self.saved[Comment]:
+            call_command('reconcile_comment_counts', stdout=self.stdout)
+        if any(self.saved[model] for model in MODELS if model is not User):
+            call_command('rebuild_search_index', stdout=self.stdout)
+        if any(self.saved.values()):
+            self.invalidate_caches()
+        for model in MODELS:
+            self.stdout.write(
+                f'{capfirst(model._meta.verbose_name_plural)}: '
+                f'{self.saved[model]}')
+        self.stdout.write(self.style.SUCCESS(
+            'Загрузка завершена. Копии изображений создаёт команда '
+            'make_image_renditions.'))
+
+    def recount_blobs(self):
+        """
+        Set references of post images from the posts that use them, so
+        objects skipped with --ignore-conflicts are not counted twice.
+        """
+        images = Post.objects.exclude(image='').exclude(
+            image__isnull=True).order_by().values('image')
+        MediaBlob.objects.filter(name__in=images).update(
+            references=Subquery(images.filter(
+                image=OuterRef('name')
+            ).annotate(count=Count('pk')).values('count')))
+        missing = images.exclude(
+            image__in=MediaBlob.objects.values('name')
+        ).annotate(references=Count('pk')).order_by('image')
+        while batch := list(missing[:self.batch_size]):
+            MediaBlob.objects.bulk_create(
+                MediaBlob(name=row['image'], references=row['references'])
+                for row in batch
+            )
+
+    def invalidate_caches(self):
+        """Drop cached feeds and pages, as bulk_create sends no signals."""
+        for author_ids in self.iter_ids(User):
+            invalidate_feeds(get_feeds(author_ids, ()))
+        for category_ids in self.iter_ids(Category):
+            invalidate_feeds(get_feeds((), category_ids))
+        purge_all_pages()
+
+    def iter_ids(self, model):
+        """Get primary keys of the model in batches."""
+        ids = model.objects.order_by().values_list('pk', flat=True).iterator(
+            chunk_size=self.batch_size)
+        while batch := list(islice(ids, self.batch_size)):
+            yield batch
@@ -0,0 +1,42 @@
+"""Make image renditions for posts uploaded before they existed."""
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from blog.images import make_renditions
+from blog.models import Post
+from blog.page_cache import purge_post_pages
+from blog.utils import get_feeds, touch_feeds
+
+CHUNK_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и для уже обработанных изображений.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            posts = posts.filter(image_size='')
+        made = 0
+        for post in posts.only(
+                'pk', 'image', 'author_id', 'category_id'
+        ).iterator(chunk_size=CHUNK_SIZE):
+            try:
+                size = make_renditions(post.image)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            # Cards are cached by updated_at, pages and feeds by version
+            Post.objects.filter(pk=post.pk).update(
+                image_size=size, updated_at=now())
+            touch_feeds(get_feeds((post.author_id,), (post.category_id,)))
+            purge_post_pages(Post.objects.filter(pk=post.pk))
+            made += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {made}'))
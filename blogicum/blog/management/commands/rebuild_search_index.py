@@ -0,0 +1,25 @@
+"""Build the search index for posts and admin search tokens."""
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import TOKEN_FIELDS, index_post, index_tokens
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс публикаций и объектов админки.'
+
+    def handle(self, *args, **options):
+        indexed = 0
+        for post in Post.objects.only(
+                'pk', 'title', 'text').iterator(chunk_size=CHUNK_SIZE):
+            index_post(post)
+            indexed += 1
+        for model, fields in TOKEN_FIELDS.items():
+            for instance in model.objects.only('pk', *fields).iterator(
+                    chunk_size=CHUNK_SIZE):
+                index_tokens(instance)
+                indexed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано объектов: {indexed}'))
@@ -0,0 +1,48 @@
+"""Repair drift of the denormalized Post.comment_count column."""
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from blog.models import Post
+from blog.page_cache import purge_post_pages
+from blog.utils import actual_comment_count, get_feeds, touch_feeds
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество публикаций, обновляемых в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Stream ids through a server-side cursor on PostgreSQL instead of
+        # loading every drifted id at once
+        drifted = Post.objects.annotate(
+            actual=actual_comment_count()
+        ).exclude(
+            comment_count=F('actual')
+        ).order_by('pk').values_list('pk', flat=True).iterator(
+            chunk_size=batch_size)
+        fixed = 0
+        while batch := list(islice(drifted, batch_size)):
+            posts = Post.objects.filter(pk__in=batch)
+            with transaction.atomic():
+                rows = list(posts.values_list('author_id', 'category_id'))
+                posts.update(
+                    comment_count=actual_comment_count(), updated_at=now())
+            # Cards are cached by updated_at, pages and feeds by version
+            touch_feeds(get_feeds({author_id for author_id, _ in rows},
+                                  {category_id for _, category_id in rows}))
+            purge_post_pages(posts)
+            fixed += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено публикаций: {fixed}'))
@@ -0,0 +1,92 @@
+"""Move post images into the sharded content-addressed layout."""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from blog.constants import MEDIA_GC_DELAY
+from blog.images import get_rendition_names
+from blog.models import MediaBlob, Post
+from blog.page_cache import purge_post_pages
+from blog.storage import SHARDED_NAME_RE
+from blog.tasks import collect_blob
+from blog.utils import get_feeds, touch_feeds
+from jobs.queue import enqueue
+
+BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = ('Переносит изображения публикаций во вложенные каталоги '
+            'по хешу содержимого.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество файлов, переносимых за один проход.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать файлы, которые нужно перенести.'
+        )
+
+    def handle(self, *args, **options):
+        self.storage = Post._meta.get_field('image').storage
+        names = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).exclude(image__regex=SHARDED_NAME_RE).order_by(
+            'image').values_list('image', flat=True).distinct()
+        if options['dry_run']:
+            self.stdout.write(f'Файлов к переносу: {names.count()}')
+            return
+        moved = 0
+        failed = set()
+        while True:
+            batch = list(names.exclude(
+                image__in=failed)[:options['batch_size']])
+            if not batch:
+                break
+            for name in batch:
+                if self.move(name):
+                    moved += 1
+                else:
+                    failed.add(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {moved}'))
+
+    def move(self, name: str) -> bool:
+        """
+        Copy the file to its sharded name and point posts to the copy. The
+        original is left without references and collected after
+        MEDIA_GC_DELAY, so pages and forms rendered with the old name keep
+        working meanwhile and a save of the old name retains it again.
+        """
+        if not self.storage.exists(name):
+            self.stderr.write(f'{name}: файл не найден')
+            return False
+        with self.storage.open(name) as file:
+            new_name = self.storage.save(name, file)
+        for old, new in zip(get_rendition_names(name),
+                            get_rendition_names(new_name)):
+            if default_storage.exists(old) and not default_storage.exists(
+                    new):
+                with default_storage.open(old) as rendition:
+                    default_storage.save(new, rendition)
+        with transaction.atomic():
+            posts = Post.objects.filter(image=name)
+            rows = list(posts.values_list('author_id', 'category_id'))
+            feeds = get_feeds({author_id for author_id, _ in rows},
+                              {category_id for _, category_id in rows})
+            references = posts.update(image=new_name, updated_at=now())
+            MediaBlob.objects.update_or_create(
+                name=name, defaults={'references': 0})
+            _, created = MediaBlob.objects.get_or_create(
+                name=new_name, defaults={'references': references})
+            if not created:
+                MediaBlob.objects.filter(name=new_name).update(
+                    references=F('references') + references)
+            enqueue(collect_blob, name, delay=MEDIA_GC_DELAY)
+        touch_feeds(feeds)
+        purge_post_pages(Post.objects.filter(image=new_name))
+        return True
@@ -0,0 +1,82 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:40
+
+import re
+from collections import Counter
+
+import snowballstemmer
+from django.db import migrations, models
+import django.db.models.deletion
+
+CHUNK_SIZE = 1000
+SEARCH_TITLE_WEIGHT = 3
+
+# Tokenizer as of this migration, kept here so later changes to
+# blog.search do not change the index this migration builds.
+WORD_RE = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def tokenize(text):
+    return [
+        term[:MAX_TERM_LENGTH]
+        for term in stemmer.stemWords(
+            [word.lower() for word in WORD_RE.findall(text)])
+    ]
+
+
+def fill_search_index(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    SearchDocument = apps.get_model('blog', 'SearchDocument')
+    SearchTerm = apps.get_model('blog', 'SearchTerm')
+    for post in Post.objects.only('pk', 'title', 'text').iterator(
+            chunk_size=CHUNK_SIZE):
+        terms = Counter(tokenize(post.text))
+        for term in tokenize(post.title):
+            terms[term] += SEARCH_TITLE_WEIGHT
+        document = SearchDocument.objects.create(
+            post=post, length=sum(terms.values()))
+        SearchTerm.objects.bulk_create(
+            SearchTerm(document=document, term=term, frequency=frequency)
+            for term, frequency in terms.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('length', models.PositiveIntegerField(verbose_name='Количество слов')),
+            ],
+            options={
+                'verbose_name': 'поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('frequency', models.PositiveIntegerField(verbose_name='Частота')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='blog.searchdocument', verbose_name='Документ')),
+            ],
+            options={
+                'verbose_name': 'поисковый термин',
+                'verbose_name_plural': 'Поисковые термины',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'document'), name='search_term_document_unique'),
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:41
+
+import re
+
+import snowballstemmer
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+TOKEN_FIELDS = {
+    'Comment': ('text',),
+    'Category': ('title', 'description'),
+    'Location': ('name',),
+}
+
+# Tokenizer as of this migration, kept here so later changes to
+# blog.search do not change the index this migration builds.
+WORD_RE = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def tokenize(text):
+    return [
+        term[:MAX_TERM_LENGTH]
+        for term in stemmer.stemWords(
+            [word.lower() for word in WORD_RE.findall(text)])
+    ]
+
+
+def fill_search_tokens(apps, schema_editor):
+    SearchToken = apps.get_model('blog', 'SearchToken')
+    for model_name, fields in TOKEN_FIELDS.items():
+        model = apps.get_model('blog', model_name)
+        for instance in model.objects.only('pk', *fields).iterator(
+                chunk_size=CHUNK_SIZE):
+            terms = set()
+            for field in fields:
+                terms.update(tokenize(getattr(instance, field)))
+            SearchToken.objects.bulk_create(
+                SearchToken(model=model._meta.label_lower,
+                            object_id=instance.pk, term=term)
+                for term in terms
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=64, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+            ],
+            options={
+                'verbose_name': 'поисковый токен',
+                'verbose_name_plural': 'Поисковые токены',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchtoken',
+            index=models.Index(fields=['model', 'object_id'], name='search_token_object_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchtoken',
+            constraint=models.UniqueConstraint(fields=('model', 'term', 'object_id'), name='search_token_unique'),
+        ),
+        migrations.RunPython(fill_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_search_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_size',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16, verbose_name='Размер изображения'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:54
+
+import blog.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_media_blobs(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    MediaBlob = apps.get_model('blog', 'MediaBlob')
+    MediaBlob.objects.bulk_create(
+        MediaBlob(name=row['image'], references=row['references'])
+        for row in Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).order_by().values('image').annotate(references=Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_image_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('name', models.CharField(max_length=256, primary_key=True, serialize=False, verbose_name='Имя файла')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Количество ссылок')),
+            ],
+            options={
+                'verbose_name': 'файл изображения',
+                'verbose_name_plural': 'Файлы изображений',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=blog.storage.ContentAddressedStorage(), upload_to='posts', verbose_name='Изображение'),
+        ),
+        migrations.RunPython(fill_media_blobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import migrations
+
+import blog.operations
+
+
+def create_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    quote_name = schema_editor.quote_name
+    schema_editor.execute(
+        'CREATE INDEX user_username_prefix_idx '
+        f'ON {quote_name(User._meta.db_table)} '
+        f'(({quote_name(User._meta.get_field("username").column)} '
+        f'COLLATE "C"));'
+    )
+
+
+def drop_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS user_username_prefix_idx;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0015_media_blob'),
+    ]
+
+    operations = [
+        blog.operations.RunSQLOnPostgreSQL(
+            sql='CREATE INDEX search_term_prefix_idx '
+                'ON blog_searchterm ((term COLLATE "C"));',
+            reverse_sql='DROP INDEX IF EXISTS search_term_prefix_idx;',
+        ),
+        blog.operations.RunSQLOnPostgreSQL(
+            sql='CREATE INDEX search_token_prefix_idx '
+                'ON blog_searchtoken (model, (term COLLATE "C"));',
+            reverse_sql='DROP INDEX IF EXISTS search_token_prefix_idx;',
+        ),
+        migrations.RunPython(create_username_index, drop_username_index),
+    ]
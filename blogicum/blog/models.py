@@ -1,9 +1,18 @@
+from django.core.files.storage import default_storage
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
-from .constants import MAX_FIELD_LENGTH, REPRESENTATION_LENGTH
+from .cascade import cascade_deletion
+from .constants import (
+    MAX_FIELD_LENGTH, MAX_SIZE_LENGTH, MAX_TERM_LENGTH, RENDITION_WIDTHS,
+    REPRESENTATION_LENGTH
+)
+from .images import (
+    FORMATS, get_rendition_name, get_rendition_size, parse_size
+)
 from .manager import PublishedPostManager
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -111,10 +120,25 @@ class Post(BaseModel):
     )
     image = models.ImageField(
         upload_to='posts',
+        storage=ContentAddressedStorage(),
         null=True,
         blank=True,
         verbose_name='Изображение'
     )
+    image_size = models.CharField(
+        max_length=MAX_SIZE_LENGTH,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Размер изображения'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name='Изменено')
     objects = models.Manager()
     published_objects = PublishedPostManager()
 
@@ -123,6 +147,22 @@ class Post(BaseModel):
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_feed_idx',
+                condition=models.Q(is_published=True)
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_published=True)
+            ),
+        )
 
     def __str__(self):
         return self.title[:REPRESENTATION_LENGTH]
@@ -130,6 +170,28 @@ class Post(BaseModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', args=(self.pk,))
 
+    def delete(self, *args, **kwargs):
+        with cascade_deletion({('post', self.pk)}):
+            return super().delete(*args, **kwargs)
+
+    @property
+    def image_renditions(self):
+        """Urls and sizes of the image renditions, once they are made."""
+        size = parse_size(self.image_size)
+        if not (self.image and size):
+            return {}
+        renditions = {}
+        for rendition in RENDITION_WIDTHS:
+            width, height = get_rendition_size(*size, rendition)
+            renditions[rendition] = {
+                'width': width,
+                'height': height,
+                **{extension: default_storage.url(get_rendition_name(
+                    self.image.name, rendition, extension))
+                   for extension in FORMATS},
+            }
+        return renditions
+
 
 class Comment(BaseModelWithCreatedAtField):
     """Comment model."""
@@ -151,6 +213,110 @@ class Comment(BaseModelWithCreatedAtField):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:REPRESENTATION_LENGTH]
+
+
+class SearchDocument(models.Model):
+    """Post as seen by the search index."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+        verbose_name='Публикация'
+    )
+    length = models.PositiveIntegerField(verbose_name='Количество слов')
+
+    class Meta:
+        verbose_name = 'поисковый документ'
+        verbose_name_plural = 'Поисковые документы'
+
+    def __str__(self):
+        return str(self.post)
+
+
+class SearchTerm(models.Model):
+    """Stemmed term of a post in the inverted search index."""
+
+    document = models.ForeignKey(
+        SearchDocument,
+        on_delete=models.CASCADE,
+        related_name='terms',
+        verbose_name='Документ'
+    )
+    term = models.CharField(
+        max_length=MAX_TERM_LENGTH,
+        verbose_name='Основа слова'
+    )
+    frequency = models.PositiveIntegerField(verbose_name='Частота')
+
+    class Meta:
+        verbose_name = 'поисковый термин'
+        verbose_name_plural = 'Поисковые термины'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('term', 'document'),
+                name='search_term_document_unique'
+            ),
+        )
+
+    def __str__(self):
+        return self.term
+
+
+class SearchToken(models.Model):
+    """Stemmed term of a comment, category or location for admin search."""
+
+    model = models.CharField(max_length=MAX_TERM_LENGTH, verbose_name='Модель')
+    object_id = models.PositiveBigIntegerField(verbose_name='ID объекта')
+    term = models.CharField(
+        max_length=MAX_TERM_LENGTH,
+        verbose_name='Основа слова'
+    )
+
+    class Meta:
+        verbose_name = 'поисковый токен'
+        verbose_name_plural = 'Поисковые токены'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('model', 'term', 'object_id'),
+                name='search_token_unique'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('model', 'object_id'),
+                name='search_token_object_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.term
+
+
+class MediaBlob(models.Model):
+    """Stored post image with the number of posts that use it."""
+
+    name = models.CharField(
+        max_length=MAX_FIELD_LENGTH,
+        primary_key=True,
+        verbose_name='Имя файла'
+    )
+    references = models.PositiveIntegerField(
+        default=0, verbose_name='Количество ссылок')
+
+    class Meta:
+        verbose_name = 'файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,24 @@
+"""Migration operations for the blog app."""
+from django.db import migrations
+
+
+class RunSQLOnPostgreSQL(migrations.RunSQL):
+    """
+    RunSQL that only runs on PostgreSQL and is a no-op elsewhere, so
+    migrations with PostgreSQL-only indexes still apply on SQLite.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f'{super().describe()} (PostgreSQL)'
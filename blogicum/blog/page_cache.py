@@ -0,0 +1,133 @@
+"""Full-page cache of blog pages for anonymous visitors."""
+from functools import wraps
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blogicum.db_router import (
+    pin_reads_to_primary, read_from_primary_while_pinned
+)
+
+from .constants import PAGE_CACHE_TIMEOUT, PURGE_CHUNK_SIZE
+
+
+PAGE_GENERATION_KEY = 'page_generation'
+
+
+def get_page_version_key(path: str) -> str:
+    """Get cache key of the current version of all pages under the path."""
+    return f'page_version:{path}'
+
+
+def get_page_key(path: str, version: str, query: str) -> str:
+    """Get cache key of the page for a query string."""
+    return f'page:{path}:{version}:{md5(query.encode()).hexdigest()}'
+
+
+def invalidate(func):
+    """
+    Run the cache invalidation now and again once the current transaction
+    commits, since other clients may refill the cache from the data they
+    still see until then.
+    """
+    func()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(func)
+
+
+def purge_pages(paths):
+    """Invalidate cached pages under the paths with any query string."""
+    paths = set(paths)
+
+    def purge():
+        pin_reads_to_primary()
+        cache.set_many(
+            {get_page_version_key(path): uuid4().hex for path in paths},
+            None
+        )
+
+    invalidate(purge)
+
+
+def purge_all_pages():
+    """Invalidate every cached page by starting a new generation."""
+    def purge():
+        pin_reads_to_primary()
+        cache.set(PAGE_GENERATION_KEY, uuid4().hex, None)
+
+    invalidate(purge)
+
+
+def get_version(key: str) -> str:
+    """Get the version stored under the key, starting one if missing."""
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def get_post_paths(post_id, username, category_slugs):
+    """Get paths of pages that display the post."""
+    return [
+        reverse('blog:index'),
+        reverse('blog:post_detail', args=(post_id,)),
+        reverse('blog:post_comments', args=(post_id,)),
+        reverse('blog:profile', args=(username,)),
+        *(reverse('blog:category_posts', args=(slug,))
+          for slug in category_slugs if slug),
+    ]
+
+
+def purge_post_pages(posts):
+    """Invalidate pages of every post in the queryset."""
+    paths = set()
+    for post_id, username, slug in posts.order_by().values_list(
+            'pk', 'author__username', 'category__slug'
+    ).iterator(chunk_size=PURGE_CHUNK_SIZE):
+        paths.update(get_post_paths(post_id, username, (slug,)))
+    purge_pages(paths)
+
+
+def get_timeout():
+    """Cache pages until the next scheduled post goes live."""
+    from .models import Post
+
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=now()
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    if next_pub_date is None:
+        return PAGE_CACHE_TIMEOUT
+    return min(PAGE_CACHE_TIMEOUT,
+               int((next_pub_date - now()).total_seconds()) + 1)
+
+
+def cache_page_for_anonymous(view):
+    """Serve pages to anonymous visitors from the cache."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        version = '{}.{}'.format(
+            get_version(PAGE_GENERATION_KEY),
+            get_version(get_page_version_key(request.path)))
+        page_key = get_page_key(
+            request.path, version, request.META.get('QUERY_STRING', ''))
+        response = cache.get(page_key)
+        if response is not None:
+            return response
+        with read_from_primary_while_pinned():
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.cookies:
+                return response
+            if callable(getattr(response, 'render', None)):
+                response.render()
+            cache.set(page_key, response, get_timeout())
+        return response
+
+    return wrapper
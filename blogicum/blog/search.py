@@ -0,0 +1,196 @@
+"""Full-text search over posts backed by an inverted index."""
+import re
+from collections import Counter
+from functools import partial
+from math import log
+
+import snowballstemmer
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, Sum, Value, When
+)
+from django.db.models.functions import Collate
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .constants import (
+    BM25_B, BM25_K1, MAX_TERM_LENGTH, SEARCH_STATS_CACHE_TIMEOUT,
+    SEARCH_TITLE_WEIGHT, SNIPPET_WORDS
+)
+from .models import (
+    Category, Comment, Location, Post, SearchDocument, SearchTerm,
+    SearchToken
+)
+from .page_cache import invalidate
+
+WORD_RE = re.compile(r'\w+')
+SEARCH_STATS_KEY = 'search_stats'
+PREFIX_END = '\uffff'
+# Collation that orders by code points on PostgreSQL, matching the prefix
+# range and the indexes of migration 0016
+PREFIX_COLLATION = 'C'
+TOKEN_FIELDS = {
+    Comment: ('text',),
+    Category: ('title', 'description'),
+    Location: ('name',),
+}
+
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def stem(words):
+    """Get lowercase stems of the words."""
+    return [
+        term[:MAX_TERM_LENGTH]
+        for term in stemmer.stemWords([word.lower() for word in words])
+    ]
+
+
+def tokenize(text: str):
+    """Split text into stemmed terms."""
+    return stem(WORD_RE.findall(text))
+
+
+@transaction.atomic
+def index_post(post):
+    """Replace index entries of the post with its current terms."""
+    terms = Counter(tokenize(post.text))
+    for term in tokenize(post.title):
+        terms[term] += SEARCH_TITLE_WEIGHT
+    document, _ = SearchDocument.objects.update_or_create(
+        post=post, defaults={'length': sum(terms.values())})
+    document.terms.all().delete()
+    SearchTerm.objects.bulk_create(
+        SearchTerm(document=document, term=term, frequency=frequency)
+        for term, frequency in terms.items()
+    )
+    invalidate(partial(cache.delete, SEARCH_STATS_KEY))
+
+
+@transaction.atomic
+def index_tokens(instance):
+    """Replace admin search tokens of the object with its current terms."""
+    forget_tokens(instance)
+    terms = set()
+    for field in TOKEN_FIELDS[type(instance)]:
+        terms.update(tokenize(getattr(instance, field)))
+    SearchToken.objects.bulk_create(
+        SearchToken(model=instance._meta.label_lower,
+                    object_id=instance.pk, term=term)
+        for term in terms
+    )
+
+
+def forget_tokens(instance):
+    """Remove admin search tokens of the object."""
+    SearchToken.objects.filter(
+        model=instance._meta.label_lower, object_id=instance.pk
+    ).delete()
+
+
+def forget_comment_tokens(comments):
+    """Remove admin search tokens of the comments with one query."""
+    SearchToken.objects.filter(
+        model=Comment._meta.label_lower, object_id__in=comments.values('pk')
+    ).delete()
+
+
+def filter_prefix(queryset, field: str, prefix: str):
+    """
+    Keep objects whose field starts with the prefix, as a range that an
+    index on the field can serve. PostgreSQL compares in the C collation,
+    as locale collations do not order PREFIX_END after every character.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        queryset = queryset.alias(**{
+            f'{field}_c': Collate(field, PREFIX_COLLATION)})
+        field = f'{field}_c'
+    return queryset.filter(**{
+        f'{field}__gte': prefix, f'{field}__lt': prefix + PREFIX_END})
+
+
+def filter_by_terms(queryset, search_term: str):
+    """Keep objects having a term starting with each stemmed search word."""
+    for term in set(tokenize(search_term)):
+        if queryset.model is Post:
+            queryset = queryset.filter(pk__in=filter_prefix(
+                SearchTerm.objects.all(), 'term', term
+            ).values('document_id'))
+        else:
+            queryset = queryset.filter(pk__in=filter_prefix(
+                SearchToken.objects.filter(
+                    model=queryset.model._meta.label_lower),
+                'term', term
+            ).values('object_id'))
+    return queryset
+
+
+def get_search_stats():
+    """Get number of indexed posts and their average length."""
+    stats = cache.get(SEARCH_STATS_KEY)
+    if stats is None:
+        stats = SearchDocument.objects.aggregate(
+            total=Count('pk'), average_length=Avg('length'))
+        cache.set(SEARCH_STATS_KEY, stats, SEARCH_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def get_idf(terms, total: int):
+    """Get BM25 inverse document frequency of each term."""
+    frequencies = dict(SearchTerm.objects.filter(
+        term__in=terms
+    ).values('term').annotate(
+        count=Count('pk')
+    ).values_list('term', 'count'))
+    return {
+        term: log(1 + (total - count + 0.5) / (count + 0.5))
+        for term, count in frequencies.items()
+    }
+
+
+def search_posts(query: str):
+    """Get published posts matching the query ordered by BM25 score."""
+    terms = set(tokenize(query))
+    stats = get_search_stats()
+    idf = get_idf(terms, stats['total']) if terms else {}
+    if not idf:
+        return Post.published_objects.none()
+    frequency = F('search_document__terms__frequency')
+    length_norm = Value(BM25_K1) * (
+        Value(1 - BM25_B) + Value(BM25_B) * F('search_document__length')
+        / Value(stats['average_length'])
+    )
+    term_idf = Case(
+        *(When(search_document__terms__term=term, then=Value(value))
+          for term, value in idf.items()),
+        output_field=FloatField()
+    )
+    return Post.published_objects.filter(
+        search_document__terms__term__in=idf
+    ).annotate(
+        score=Sum(
+            term_idf * frequency * Value(BM25_K1 + 1)
+            / (frequency + length_norm),
+            output_field=FloatField()
+        )
+    ).order_by('-score', '-pub_date')
+
+
+def make_snippet(text: str, query: str, size: int = SNIPPET_WORDS):
+    """Get a fragment of the text around the first match, with highlight."""
+    terms = set(tokenize(query))
+    words = text.split()
+    first = next((
+        index for index, word in enumerate(words)
+        if terms.intersection(tokenize(word))
+    ), 0)
+    start = max(first - size // 3, 0)
+    fragment = []
+    for word in words[start:start + size]:
+        matched = terms.intersection(tokenize(word))
+        word = escape(word)
+        fragment.append(f'<mark>{word}</mark>' if matched else word)
+    prefix = '… ' if start > 0 else ''
+    suffix = ' …' if start + size < len(words) else ''
+    return mark_safe(prefix + ' '.join(fragment) + suffix)
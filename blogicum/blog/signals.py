@@ -0,0 +1,270 @@
+"""Signal handlers for the blog app."""
+from functools import partial
+
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils.timezone import now
+
+from jobs.queue import enqueue
+
+from .blobs import release_blob, retain_blob
+from .cascade import is_cascaded
+from .models import Category, Comment, Location, Post, User
+from .page_cache import (
+    get_post_paths, invalidate, purge_pages, purge_post_pages
+)
+from .search import (
+    SEARCH_STATS_KEY, forget_comment_tokens, forget_tokens, index_post,
+    index_tokens
+)
+from .tasks import make_post_renditions
+from .utils import (
+    actual_comment_count, get_feeds, invalidate_feeds, touch_feeds
+)
+
+
+@receiver(pre_delete, sender=Post)
+def prepare_post_deletion(sender, instance, **kwargs):
+    """Drop search tokens of the post comments at once before cascade."""
+    forget_comment_tokens(Comment.objects.filter(post=instance))
+
+
+@receiver(pre_delete, sender=User)
+def prepare_user_deletion(sender, instance, **kwargs):
+    """
+    Remember posts of other authors the user commented on and drop search
+    tokens of the user comments at once before cascade.
+    """
+    comments = Comment.objects.filter(author=instance)
+    instance._commented_post_ids = list(Post.objects.filter(
+        pk__in=comments.values('post_id')
+    ).exclude(author=instance).values_list('pk', flat=True))
+    forget_comment_tokens(comments)
+
+
+@receiver(post_delete, sender=User)
+def finish_user_deletion(sender, instance, **kwargs):
+    """Recount comments of the posts that lost the user comments."""
+    post_ids = getattr(instance, '_commented_post_ids', None)
+    if not post_ids:
+        return
+    posts = Post.objects.filter(pk__in=post_ids)
+    rows = list(posts.values_list('author_id', 'category_id'))
+    posts.update(comment_count=actual_comment_count(), updated_at=now())
+    touch_feeds(get_feeds({author_id for author_id, _ in rows},
+                          {category_id for _, category_id in rows}))
+    purge_post_pages(posts)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Increase comment counter and version of the post on comment save."""
+    if raw:
+        return
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=now())
+    else:
+        Post.objects.filter(pk=instance.post_id).update(updated_at=now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Decrease comment counter of the post when a comment is removed."""
+    if is_cascaded(instance):
+        return
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1, updated_at=now())
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw=False, **kwargs):
+    """Remember the category and the image the post is changed from."""
+    instance._old_category_id = instance._old_image = None
+    if instance.pk and not raw:
+        instance._old_category_id, instance._old_image = next(iter(
+            Post.objects.filter(pk=instance.pk).values_list(
+                'category_id', 'image')
+        ), (None, None))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    """Drop cached totals of the feeds the post belongs to."""
+    invalidate_feeds(get_feeds(
+        (instance.author_id,),
+        (instance.category_id, getattr(instance, '_old_category_id', None))
+    ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, **kwargs):
+    """Drop cached totals of the feeds that show posts of the category."""
+    author_ids = Post.objects.filter(
+        category_id=instance.pk
+    ).order_by().values_list('author_id', flat=True).distinct()
+    invalidate_feeds(get_feeds(author_ids, (instance.pk,)))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comment_feeds(sender, instance, **kwargs):
+    """Mark feeds showing the comment counter of the post as modified."""
+    if kwargs['signal'] is post_delete and is_cascaded(instance):
+        return
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'author_id', 'category_id').first()
+    if post is not None:
+        touch_feeds(get_feeds((post['author_id'],), (post['category_id'],)))
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_feeds(sender, instance, **kwargs):
+    """Mark feeds showing posts with the location as modified."""
+    posts = Post.objects.filter(location=instance).order_by()
+    touch_feeds(get_feeds(
+        posts.values_list('author_id', flat=True).distinct(),
+        posts.values_list('category_id', flat=True).distinct()
+    ))
+
+
+@receiver(post_save, sender=User)
+def touch_profile_feeds(sender, instance, **kwargs):
+    """Mark feeds of the user profile page as modified."""
+    touch_feeds((('author', instance.pk), ('author_all', instance.pk)))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_posts(sender, instance, **kwargs):
+    """Renew version of posts whose cards show the category."""
+    Post.objects.filter(category=instance).update(updated_at=now())
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_posts(sender, instance, **kwargs):
+    """Renew version of posts whose cards show the location."""
+    Post.objects.filter(location=instance).update(updated_at=now())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_cached_pages(sender, instance, **kwargs):
+    """Purge cached pages that display the post."""
+    category_slugs = Category.objects.filter(
+        pk__in=(instance.category_id,
+                getattr(instance, '_old_category_id', None))
+    ).values_list('slug', flat=True)
+    purge_pages(get_post_paths(
+        instance.pk, instance.author.username, category_slugs))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_cached_pages(sender, instance, **kwargs):
+    """Purge cached pages that show the comment or the comment counter."""
+    if kwargs['signal'] is post_delete and is_cascaded(instance):
+        return
+    purge_post_pages(Post.objects.filter(pk=instance.post_id))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance, raw=False, **kwargs):
+    """Remember the slug the category is renamed from."""
+    instance._old_slug = None
+    if instance.pk and not raw:
+        instance._old_slug = Category.objects.filter(
+            pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def purge_category_cached_pages(sender, instance, **kwargs):
+    """Purge cached pages of the category and of its posts."""
+    purge_post_pages(Post.objects.filter(category=instance))
+    purge_pages(
+        reverse('blog:category_posts', args=(slug,))
+        for slug in (instance.slug, getattr(instance, '_old_slug', None))
+        if slug
+    )
+    purge_pages((reverse('blog:index'),))
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def purge_location_cached_pages(sender, instance, **kwargs):
+    """Purge cached pages of posts with the location."""
+    purge_post_pages(Post.objects.filter(location=instance))
+
+
+@receiver(post_save, sender=User)
+def purge_profile_cached_pages(sender, instance, **kwargs):
+    """Purge cached profile page of the user."""
+    purge_pages((reverse('blog:profile', args=(instance.username,)),))
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Reindex the post after it is saved."""
+    if not raw:
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def forget_search_stats(sender, instance, **kwargs):
+    """Drop search statistics after the post leaves the index."""
+    invalidate(partial(cache.delete, SEARCH_STATS_KEY))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def update_search_tokens(sender, instance, raw=False, **kwargs):
+    """Reindex admin search tokens of the object after it is saved."""
+    if not raw:
+        index_tokens(instance)
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def delete_search_tokens(sender, instance, **kwargs):
+    """Remove admin search tokens of the deleted object."""
+    if isinstance(instance, Comment) and is_cascaded(instance):
+        return
+    forget_tokens(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_post_image(sender, instance, raw=False, **kwargs):
+    """Move the reference to a new image and make its renditions."""
+    if raw:
+        return
+    old_image = getattr(instance, '_old_image', None)
+    if old_image == instance.image.name:
+        return
+    if old_image:
+        release_blob(old_image)
+    if instance.image_size:
+        instance.image_size = ''
+        Post.objects.filter(pk=instance.pk).update(image_size='')
+    if instance.image:
+        retain_blob(instance.image.name)
+        enqueue(make_post_renditions, instance.pk, instance.image.name)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    """Drop the reference of the deleted post to its image."""
+    if instance.image:
+        release_blob(instance.image.name)
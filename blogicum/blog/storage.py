@@ -0,0 +1,65 @@
+"""Content-addressed storage of uploaded media."""
+import os
+import posixpath
+from hashlib import sha256
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 64 * 1024
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+SHARDED_NAME_RE = (
+    r'(^|/)' + r'[0-9a-f]{%d}/' % SHARD_WIDTH * SHARD_DEPTH
+    + r'[0-9a-f]{64}(\.[^/]*)?$'
+)
+
+
+def get_shards(digest: str):
+    """Get names of the nested directories for the digest."""
+    return [
+        digest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+        for level in range(SHARD_DEPTH)
+    ]
+
+
+def get_digest(content) -> str:
+    """Get SHA-256 of the file, reusing the one taken while uploading."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    digest = sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the hash of their content,
+    so identical uploads are written once and share one name. Files are
+    spread over shard directories to keep each directory small.
+    """
+
+    def get_content_name(self, name: str, digest: str) -> str:
+        """
+        Get name of the blob with the digest in the upload directory,
+        nested in shard directories named by the leading digest characters.
+        """
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(
+            directory, *get_shards(digest), f'{digest}{extension}')
+
+    def _save(self, name, content):
+        name = self.get_content_name(name, get_digest(content))
+        if self.exists(name):
+            return name
+        # Write under a unique temporary name first, so a concurrent upload
+        # of the same content never sees a partially written blob.
+        temporary = super()._save(f'{name}.part', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
@@ -0,0 +1,36 @@
+"""Background tasks of the blog app."""
+from django.utils.timezone import now
+
+from jobs.queue import task
+
+from .images import delete_renditions, make_renditions
+from .models import MediaBlob, Post
+from .page_cache import purge_post_pages
+from .utils import get_feeds, touch_feeds
+
+
+@task
+def make_post_renditions(post_id: int, name: str):
+    """Make renditions of the post image unless it was replaced since."""
+    posts = Post.objects.filter(pk=post_id, image=name)
+    post = posts.only('pk', 'image', 'author_id', 'category_id').first()
+    if post is None:
+        return
+    # Identical uploads share one file and so its renditions.
+    size = Post.objects.filter(image=name).exclude(
+        image_size='').values_list('image_size', flat=True).first()
+    if size is None:
+        size = make_renditions(post.image)
+    if posts.update(image_size=size, updated_at=now()):
+        touch_feeds(get_feeds((post.author_id,), (post.category_id,)))
+        purge_post_pages(posts)
+
+
+@task
+def collect_blob(name: str):
+    """Delete the stored file and its renditions unless it is used again."""
+    deleted, _ = MediaBlob.objects.filter(name=name, references=0).delete()
+    if deleted:
+        storage = Post._meta.get_field('image').storage
+        storage.delete(name)
+        delete_renditions(name)
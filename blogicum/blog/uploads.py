@@ -0,0 +1,84 @@
+"""Bounded-memory handling of uploaded post images."""
+from functools import wraps
+from hashlib import sha256
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from .constants import MAX_IMAGE_BYTES
+
+SIGNATURES = (
+    (b'\xff\xd8\xff',),
+    (b'\x89PNG\r\n\x1a\n',),
+    (b'GIF87a',),
+    (b'GIF89a',),
+    (b'RIFF', b'WEBP'),
+)
+HEADER_LENGTH = 12
+
+
+def is_image_header(header: bytes) -> bool:
+    """Check that the first bytes of a file belong to a known image format."""
+    return any(
+        header.startswith(signature[0])
+        and (len(signature) == 1 or header[8:12] == signature[1])
+        for signature in SIGNATURES
+    )
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream uploads to a temporary file while hashing them.
+    Files that are too large or do not start like an image stop being
+    written at once and carry upload_error for the form to report.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hash = sha256()
+        self.header = b''
+        self.upload_error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload_error:
+            return None
+        if start + len(raw_data) > MAX_IMAGE_BYTES:
+            return self.reject('too_large')
+        if len(self.header) < HEADER_LENGTH:
+            self.header += raw_data[:HEADER_LENGTH - len(self.header)]
+            if (len(self.header) == HEADER_LENGTH
+                    and not is_image_header(self.header)):
+                return self.reject('invalid_image')
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.upload_error and not is_image_header(self.header):
+            self.reject('invalid_image')
+        file = super().file_complete(file_size)
+        file.sha256 = self.hash.hexdigest()
+        file.upload_error = self.upload_error
+        return file
+
+    def reject(self, error: str):
+        """Drop what was written of the file and remember why."""
+        self.upload_error = error
+        self.file.seek(0)
+        self.file.truncate()
+
+
+def stream_image_uploads(view):
+    """
+    Receive files of the view through ImageUploadHandler. Handlers must be
+    set before CSRF middleware reads the body, so CSRF is checked here.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+
+    return wrapper
@@ -10,6 +10,9 @@ urlpatterns = [
     # Index page
     path('', views.IndexListView.as_view(), name='index'),
 
+    # Search
+    path('search/', views.search, name='search'),
+
     # Categories
     path('category/<slug:category_slug>/',
          views.category_posts, name='category_posts'),
@@ -25,6 +28,8 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/', views.delete_post, name='delete_post'),
 
     # CRUD comments
+    path('posts/<int:post_id>/comments/',
+         views.post_comments, name='post_comments'),
     path('posts/<int:post_id>/comment/',
          views.create_comment, name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
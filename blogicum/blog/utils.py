@@ -1,18 +1,251 @@
 """Utility functions for blog app."""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from datetime import datetime
+from functools import partial
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.template.loader import render_to_string
+from django.utils.functional import cached_property
+from django.utils.safestring import mark_safe
+from django.utils.timezone import now
 
-from .constants import QUERIES_PER_PAGE
+from blogicum.db_router import pin_reads_to_primary
 
+from .constants import (
+    CARD_CACHE_TIMEOUT, COMMENTS_PER_PAGE, COUNT_ESTIMATE_LIMIT,
+    FEED_COUNT_CACHE_TIMEOUT, PAGES_ON_EACH_SIDE, PAGES_ON_ENDS,
+    QUERIES_PER_PAGE
+)
+from .models import Comment
+from .page_cache import invalidate
+
+NEXT, PREVIOUS = 'n', 'p'
+
+
+def encode_cursor(obj, direction: str = NEXT, field='pub_date') -> str:
+    """Encode object position in the feed as an opaque cursor."""
+    raw = f'{direction}|{getattr(obj, field).isoformat()}|{obj.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """Decode cursor into (direction, pub_date, pk)."""
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, pub_date, pk = raw.split('|')
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError
+        return direction, datetime.fromisoformat(pub_date), int(pk)
+    except (DecodeError, UnicodeDecodeError, ValueError):
+        raise Http404('Неверный курсор страницы.')
+
+
+class CursorPage:
+    """Page of a feed fetched by (pub_date, id) keyset."""
+
+    cursor_based = True
+
+    def __init__(self, object_list, has_next: bool, has_previous: bool,
+                 field='pub_date'):
+        self.object_list = object_list
+        # A cursor past the last row gives an empty page without neighbours
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+        self.field = field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1], NEXT, self.field)
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0], PREVIOUS, self.field)
+
+
+def get_cursor_page(queryset, cursor: str, per_page=QUERIES_PER_PAGE):
+    """Get page of posts following or preceding the cursor position."""
+    direction, pub_date, pk = decode_cursor(cursor)
+    if direction == NEXT:
+        posts = list(queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        ).order_by('-pub_date', '-pk')[:per_page + 1])
+        return CursorPage(posts[:per_page], len(posts) > per_page, True)
+    posts = list(queryset.filter(
+        Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+    ).order_by('pub_date', 'pk')[:per_page + 1])
+    return CursorPage(posts[:per_page][::-1], True, len(posts) > per_page)
+
+
+def get_feed_count_key(feed: str, pk=None) -> str:
+    """Get cache key of the total number of posts in a feed."""
+    return f'feed_count:{feed}' if pk is None else f'feed_count:{feed}:{pk}'
+
+
+def get_feed_modified_key(feed: str, pk=None) -> str:
+    """Get cache key of the last time the feed content changed."""
+    return (f'feed_modified:{feed}' if pk is None
+            else f'feed_modified:{feed}:{pk}')
+
+
+def get_feeds(author_ids=(), category_ids=()):
+    """Get feeds that show posts of the authors and categories."""
+    return [
+        ('index',),
+        *(('author', pk) for pk in author_ids),
+        *(('author_all', pk) for pk in author_ids),
+        *(('category', pk) for pk in category_ids if pk is not None),
+    ]
 
-def get_page_obj(queryset, request):
-    """Get page for Paginator."""
-    paginator = Paginator(queryset, QUERIES_PER_PAGE)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
 
+def actual_comment_count():
+    """Expression with the real number of comments of the outer post."""
+    return Coalesce(Subquery(
+        Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
 
-def get_comment_count(posts):
-    """Get comment count for post."""
-    return posts.annotate(
-        comment_count=Count('comments'))
+
+def touch_feeds(feeds):
+    """Mark feeds as modified now."""
+    keys = [get_feed_modified_key(*feed) for feed in feeds]
+
+    def touch():
+        pin_reads_to_primary()
+        cache.set_many(dict.fromkeys(keys, now()), None)
+
+    invalidate(touch)
+
+
+def invalidate_feeds(feeds):
+    """Drop cached totals of the feeds and mark them as modified."""
+    feeds = list(feeds)
+    invalidate(partial(
+        cache.delete_many, [get_feed_count_key(*feed) for feed in feeds]))
+    touch_feeds(feeds)
+
+
+def get_feed_last_modified(feed, pk=None):
+    """Get the last time the feed content changed, now if unknown."""
+    return cache.get_or_set(get_feed_modified_key(feed, pk), now, None)
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that counts objects without joins and caches the total.
+    With estimate=True the count stops at estimate_limit rows.
+    """
+
+    estimate_limit = COUNT_ESTIMATE_LIMIT
+
+    def __init__(self, *args, cache_key=None, estimate=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.estimate = estimate
+
+    def _count(self):
+        objects = self.object_list.select_related(None).order_by()
+        if self.estimate:
+            objects = objects[:self.estimate_limit]
+        return objects.count()
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self._count()
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self._count()
+            cache.set(self.cache_key, count, FEED_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+def get_elided_page_range(page, on_each_side=PAGES_ON_EACH_SIDE,
+                          on_ends=PAGES_ON_ENDS):
+    """Get page numbers around the current page and at both ends."""
+    return list(page.paginator.get_elided_page_range(
+        page.number, on_each_side=on_each_side, on_ends=on_ends))
+
+
+def get_comments_page(post, cursor=None, per_page=COMMENTS_PER_PAGE):
+    """Get comments of the post following the cursor position."""
+    comments = post.comments.select_related('author').order_by(
+        'created_at', 'pk')
+    if cursor:
+        _, created_at, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        )
+    comments = list(comments[:per_page + 1])
+    return CursorPage(comments[:per_page], len(comments) > per_page, False,
+                      field='created_at')
+
+
+def set_navigation(page):
+    """Attach next page cursor and windowed page range to the page."""
+    page.next_cursor = (
+        encode_cursor(page[-1]) if page.has_next() else None
+    )
+    page.elided_page_range = get_elided_page_range(page)
+    return page
+
+
+def get_post_card_key(post) -> str:
+    """Get cache key of the rendered post card for the post version."""
+    return (f'post_card:{post.pk}:{post.updated_at.timestamp()}:'
+            f'{post.author.username}')
+
+
+def render_post_cards(page):
+    """Attach rendered cards to posts, fetching cached ones at once."""
+    keys = {get_post_card_key(post): post for post in page}
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in keys.items():
+        if key not in cards:
+            cards[key] = missing[key] = render_to_string(
+                'includes/post_card.html', {'post': post})
+        post.card = mark_safe(cards[key])
+    cache.set_many(missing, CARD_CACHE_TIMEOUT)
+    return page
+
+
+def get_page_obj(queryset, request, count_key=None, estimate=False):
+    """Get page for Paginator."""
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return render_post_cards(get_cursor_page(queryset, cursor))
+    paginator = CachedCountPaginator(
+        queryset.order_by('-pub_date', '-pk'), QUERIES_PER_PAGE,
+        cache_key=count_key, estimate=estimate
+    )
+    page_number = request.GET.get('page')
+    return render_post_cards(
+        set_navigation(paginator.get_page(page_number)))
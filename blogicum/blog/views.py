@@ -1,58 +1,103 @@
 """Views for the blog app."""
+from urllib.parse import urlencode
+
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 
 from .forms import PostForm, CommentForm, ProfileForm
 from .models import Category, Post, Comment, User
+from .conditional import (
+    category_last_modified, conditional_page, index_last_modified,
+    post_last_modified, profile_last_modified
+)
 from .constants import QUERIES_PER_PAGE
-from .utils import get_page_obj, get_comment_count
-
-
+from .page_cache import cache_page_for_anonymous
+from .search import make_snippet, search_posts
+from .uploads import stream_image_uploads
+from .writes import write
+from .utils import (
+    CachedCountPaginator, get_comments_page, get_cursor_page,
+    get_elided_page_range, get_feed_count_key, get_page_obj,
+    render_post_cards, set_navigation
+)
+
+
+@method_decorator(conditional_page(index_last_modified), name='dispatch')
+@method_decorator(cache_page_for_anonymous, name='dispatch')
 class IndexListView(ListView):
     """Display the index page."""
 
     model = Post
     template_name = 'blog/index.html'
     paginate_by = QUERIES_PER_PAGE
+    paginator_class = CachedCountPaginator
+    estimate_count = False
 
     def get_queryset(self):
-        return get_comment_count(Post.published_objects.all())
-
-
+        return Post.published_objects.order_by('-pub_date', '-pk')
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args,
+            cache_key=get_feed_count_key('index'),
+            estimate=self.estimate_count,
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get('cursor')
+        if not cursor:
+            paginator, page, _, is_paginated = (
+                super().paginate_queryset(queryset, page_size))
+            page = render_post_cards(set_navigation(page))
+            return paginator, page, page.object_list, is_paginated
+        page = render_post_cards(get_cursor_page(queryset, cursor, page_size))
+        return None, page, page.object_list, page.has_other_pages()
+
+
+@conditional_page(category_last_modified)
+@cache_page_for_anonymous
 def category_posts(request, category_slug: str):
     """Display all posts by category."""
-    posts = Post.published_objects.filter(
-        category__slug=category_slug)
+    category = get_object_or_404(
+        Category,
+        slug=category_slug,
+        is_published=True
+    )
+    posts = Post.published_objects.filter(category=category)
     context = {
-        'category': get_object_or_404(
-            Category,
-            slug=category_slug,
-            is_published=True
-        ),
-        'page_obj': get_page_obj(posts, request)
+        'category': category,
+        'page_obj': get_page_obj(
+            posts, request,
+            count_key=get_feed_count_key('category', category.pk)
+        )
     }
     return render(request, 'blog/category.html', context)
 
 
+@conditional_page(profile_last_modified)
+@cache_page_for_anonymous
 def profile(request, username: str):
     """Display user profile."""
     user = get_object_or_404(User, username=username)
     if not user == request.user:
-        posts = get_comment_count(
-            Post.published_objects.get_all_for_user(user))
+        posts = Post.published_objects.get_all_for_user(user)
+        count_key = get_feed_count_key('author', user.pk)
     else:
-        posts = get_comment_count(
-            Post.objects.select_related(
-                'author', 'category', 'location'
-            ).filter(
-                author=user
-            ).order_by(
-                '-pub_date'
-            ))
+        posts = Post.objects.select_related(
+            'author', 'category', 'location'
+        ).filter(
+            author=user
+        ).order_by(
+            '-pub_date'
+        )
+        count_key = get_feed_count_key('author_all', user.pk)
     context = {
         'profile': user,
-        'page_obj': get_page_obj(posts, request)
+        'page_obj': get_page_obj(posts, request, count_key=count_key)
     }
     return render(request, 'blog/profile.html', context)
 
@@ -73,20 +118,40 @@ def edit_profile(request):
     return render(request, 'blog/user.html', context)
 
 
-def post_detail(request, post_id: int):
-    """Display a post by id."""
+def get_visible_post(request, post_id: int):
+    """Get the post if the user may see it."""
     post = get_object_or_404(Post, pk=post_id)
     if request.user != post.author:
         post = get_object_or_404(Post.published_objects.all(), pk=post_id)
-    comments = post.comments.select_related('author').all()
+    return post
+
+
+@conditional_page(post_last_modified)
+@cache_page_for_anonymous
+def post_detail(request, post_id: int):
+    """Display a post by id."""
+    post = get_visible_post(request, post_id)
     context = {
         'post': post,
-        'comments': comments,
+        'comments': get_comments_page(post),
         'form': CommentForm()
     }
     return render(request, 'blog/detail.html', context)
 
 
+@conditional_page(post_last_modified)
+@cache_page_for_anonymous
+def post_comments(request, post_id: int):
+    """Display the next batch of comments to the post."""
+    post = get_visible_post(request, post_id)
+    context = {
+        'post': post,
+        'comments': get_comments_page(post, request.GET.get('cursor'))
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+@stream_image_uploads
 def edit_post(request, post_id: int):
     """Edit post."""
     post = get_object_or_404(Post, pk=post_id)
@@ -95,19 +160,20 @@ def edit_post(request, post_id: int):
     form = PostForm(request.POST or None,
                     files=request.FILES or None, instance=post)
     if form.is_valid():
-        form.save()
+        write(form.save)
         return redirect('blog:post_detail', post_id=post_id)
     return render(request, 'blog/create.html', {'form': form})
 
 
 @login_required
+@stream_image_uploads
 def create_post(request):
     """Create a post."""
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid() and request.method == 'POST':
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        write(post.save)
         return redirect('blog:profile', username=request.user.username)
     return render(request, 'blog/create.html', {'form': form})
 
@@ -132,7 +198,7 @@ def create_comment(request, post_id: int):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = get_object_or_404(Post, pk=post_id)
-        comment.save()
+        write(comment.save)
         return redirect('blog:post_detail', post_id=comment.post.pk)
     return render(request, 'blog/comment.html', {'form': form})
 
@@ -142,7 +208,7 @@ def edit_comment(request, post_id: int, comment_id: int):
     comment = get_object_or_404(Comment, pk=comment_id)
     form = CommentForm(request.POST or None, instance=comment)
     if form.is_valid() and comment.author == request.user:
-        form.save()
+        write(form.save)
         return redirect('blog:post_detail', post_id=post_id)
     return render(
         request,
@@ -160,3 +226,19 @@ def delete_comment(request, post_id: int, comment_id: int):
         comment.delete()
         return redirect('blog:post_detail', post_id=post_id)
     return render(request, 'blog/comment.html', {'comment': comment})
+
+
+def search(request):
+    """Display published posts matching the search query."""
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search_posts(query), QUERIES_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.elided_page_range = get_elided_page_range(page_obj)
+    for post in page_obj:
+        post.snippet = make_snippet(post.text, query)
+    context = {
+        'q': query,
+        'query_string': f"{urlencode({'q': query})}&",
+        'page_obj': page_obj
+    }
+    return render(request, 'blog/search.html', context)
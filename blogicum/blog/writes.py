@@ -0,0 +1,121 @@
+"""Optional single-writer path for post and comment writes."""
+import threading
+from contextvars import copy_context
+from concurrent.futures import Future, TimeoutError
+from queue import Empty, SimpleQueue
+from time import monotonic
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .constants import WRITE_BATCH_DELAY, WRITE_BATCH_SIZE, WRITE_TIMEOUT
+
+
+class BatchCommitter:
+    """
+    Thread that runs writes submitted by request threads, many of them in
+    one transaction, and hands each result back to its request. Every
+    write gets a savepoint, so a failing write does not undo the others.
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE,
+                 batch_delay=WRITE_BATCH_DELAY):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue = SimpleQueue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run the write in the committer thread and wait for its result.
+        A write that has not started within WRITE_TIMEOUT is cancelled,
+        a started one is waited for to report its real outcome.
+        """
+        future = Future()
+        # Run in the request's context, so the write is seen by the state
+        # kept in context variables, such as read routing.
+        self.queue.put((future, copy_context().run, (func, *args), kwargs))
+        self.start()
+        try:
+            return future.result(timeout=WRITE_TIMEOUT)
+        except TimeoutError:
+            if future.cancel():
+                raise
+        return future.result()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='blog-writer', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            self.commit(self.get_batch())
+
+    def get_batch(self):
+        """Wait for a write, then collect more for a short while."""
+        batch = [self.queue.get()]
+        deadline = monotonic() + self.batch_delay
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(
+                    timeout=max(deadline - monotonic(), 0)))
+            except Empty:
+                break
+        return batch
+
+    def commit(self, batch):
+        """
+        Run the batch in one transaction. Every future gets its result or
+        an exception whatever fails, so no request waits forever.
+        """
+        outcomes = []
+        failure = None
+        try:
+            close_old_connections()
+            with transaction.atomic():
+                for future, func, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, func(*args, **kwargs)))
+                    except Exception as error:
+                        outcomes.append((future, error))
+        except Exception as error:
+            failure = error
+        finally:
+            self.resolve(batch, outcomes, failure)
+
+    @staticmethod
+    def resolve(batch, outcomes, failure):
+        """Hand results to the futures of the batch."""
+        if failure is None:
+            for future, outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            return
+        for future, *_ in batch:
+            if future.cancelled():
+                continue
+            if not future.running():
+                future.set_running_or_notify_cancel()
+            future.set_exception(failure)
+
+
+committer = BatchCommitter()
+
+
+def write(func, *args, **kwargs):
+    """
+    Run a post or comment write, through the committer when
+    BLOG_BATCH_WRITES is set and directly otherwise.
+    """
+    if getattr(settings, 'BLOG_BATCH_WRITES', False):
+        return committer.submit(func, *args, **kwargs)
+    return func(*args, **kwargs)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class BlogicumConfig(AppConfig):
+    name = 'blogicum'
+    verbose_name = 'Блогикум'
+
+    def ready(self):
+        from . import checks, connections, sqlite  # noqa: F401
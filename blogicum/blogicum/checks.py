@@ -0,0 +1,22 @@
+"""System checks of the deployment settings."""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when worker processes would not share the default cache."""
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кеш по умолчанию не разделяется между процессами: сброс кеша '
+        'страниц, отметки лент и чтение с основной базы после записи '
+        'не дойдут до других воркеров.',
+        hint='Задайте CACHE_BACKEND=memcached или CACHE_BACKEND=file.',
+        id='blogicum.W001',
+    )]
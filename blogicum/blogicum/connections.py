@@ -0,0 +1,19 @@
+"""Health checks of persistent database connections."""
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+@receiver(request_started)
+def check_persistent_connections(**kwargs):
+    """
+    Close reused connections that broke while idle, for databases with
+    CONN_HEALTH_CHECKS, so the request opens a new one instead of failing.
+    Django 3.2 only checks connections after an error.
+    """
+    for connection in connections.all():
+        if (connection.connection is not None
+                and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
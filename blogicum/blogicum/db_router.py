@@ -0,0 +1,122 @@
+"""Routing of reads to replica databases with read-your-writes."""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_COOKIE_NAME = 'primary_until'
+PRIMARY_UNTIL_KEY = 'reads_on_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+routing = ContextVar('routing', default=None)
+
+
+class RoutingState:
+    """Whether reads of the current request may go to a replica."""
+
+    def __init__(self, use_replicas: bool):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+def get_replicas():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def pin_reads_to_primary():
+    """
+    Refill cached pages and read the freshness of feeds from the primary
+    for READ_YOUR_WRITES_WINDOW seconds after they are invalidated, so they
+    are not rebuilt from a replica that has not seen the write yet.
+    """
+    if get_replicas():
+        window = settings.READ_YOUR_WRITES_WINDOW
+        cache.set(PRIMARY_UNTIL_KEY, time() + window, window)
+
+
+def reads_pinned_to_primary() -> bool:
+    return bool(get_replicas()) and cache.get(PRIMARY_UNTIL_KEY, 0) > time()
+
+
+@contextmanager
+def read_from_primary_while_pinned():
+    """Send reads inside the block to the primary while the pin lasts."""
+    state = routing.get()
+    if state is None or not state.use_replicas or (
+            not reads_pinned_to_primary()):
+        yield
+        return
+    state.use_replicas = False
+    try:
+        yield
+    finally:
+        state.use_replicas = True
+
+
+class PrimaryReplicaRouter:
+    """
+    Send writes to the primary and reads of safe requests to a random
+    replica. Reads outside requests, in unsafe requests and after a write
+    stay on the primary, so commands and workers always see fresh data.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing.get()
+        replicas = get_replicas()
+        if (state is None or not state.use_replicas or state.wrote
+                or not replicas):
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from replicas unless the client wrote recently.
+    A request that writes sets a cookie that keeps the client's reads on
+    the primary for READ_YOUR_WRITES_WINDOW seconds, longer than the lag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            primary_until = float(
+                request.COOKIES.get(PRIMARY_COOKIE_NAME, 0))
+        except ValueError:
+            primary_until = 0
+        state = RoutingState(
+            request.method in SAFE_METHODS and primary_until < time())
+        token = routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing.reset(token)
+        if state.wrote:
+            window = settings.READ_YOUR_WRITES_WINDOW
+            response.set_cookie(
+                PRIMARY_COOKIE_NAME, str(time() + window), max_age=window,
+                httponly=True, samesite='Lax'
+            )
+        return response
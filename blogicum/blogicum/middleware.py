@@ -0,0 +1,177 @@
+"""Serving of collected static files and uploaded media."""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+HASHED_STATIC_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+CONTENT_NAME_RE = re.compile(r'(^|/)[0-9a-f]{64}(\.[^/.]+)?$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+TEMPORARY_SUFFIX = '.part'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CACHE_CONTROL = 'public, max-age=3600'
+
+
+def get_accepted_encodings(header: str):
+    """Get codings the client accepts, skipping those with q=0."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = params.strip().partition('q=')[2]
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def parse_range(header: str, size: int):
+    """
+    Get (start, end) of a single byte range, None to send the whole file
+    or False when the range is not satisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class FileRange:
+    """
+    Part of an open file that reads no further than its end. It has no
+    fileno(), so the WSGI server cannot sendfile past the range.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class MediaFilesMiddleware:
+    """
+    Serve files from STATIC_ROOT and MEDIA_ROOT before the rest of the
+    stack. Precompressed siblings are picked by Accept-Encoding, single
+    byte ranges and conditional requests are answered, and content-hashed
+    names are cached forever. Files go out through FileResponse, so the
+    WSGI server can send them with sendfile.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            path, immutable = self.find_file(request.path_info)
+            if path is not None:
+                return self.serve(request, path, immutable)
+        return self.get_response(request)
+
+    @staticmethod
+    def find_file(url_path: str):
+        """Get file system path of the file and whether it never changes."""
+        for url, root, pattern in (
+                (settings.STATIC_URL, settings.STATIC_ROOT, HASHED_STATIC_RE),
+                (settings.MEDIA_URL, settings.MEDIA_ROOT, CONTENT_NAME_RE)):
+            if not (url and root and url_path.startswith(url)):
+                continue
+            name = url_path[len(url):]
+            if not name or name.endswith(TEMPORARY_SUFFIX) or any(
+                    part.startswith('.') for part in name.split('/')):
+                continue
+            try:
+                path = safe_join(root, name)
+            except SuspiciousFileOperation:
+                continue
+            if os.path.isfile(path):
+                return path, bool(pattern.search(name))
+        return None, False
+
+    def serve(self, request, path: str, immutable: bool):
+        content_type, file_encoding = mimetypes.guess_type(path)
+        if content_type is None or file_encoding:
+            content_type = 'application/octet-stream'
+        accepted = get_accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = None
+        variants = False
+        for coding, extension in ENCODINGS:
+            if os.path.isfile(path + extension):
+                variants = True
+                if encoding is None and coding in accepted:
+                    encoding, path = coding, path + extension
+        stat = os.stat(path)
+        etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            response = self.get_file_response(
+                request, path, stat.st_size, etag, content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if immutable else CACHE_CONTROL)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    @staticmethod
+    def get_file_response(request, path, size, etag, content_type):
+        byte_range = None
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if 'HTTP_RANGE' in request.META and if_range in (None, etag):
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        if byte_range is False:
+            response = HttpResponse(
+                status=416, content_type=content_type)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+        elif byte_range:
+            response = FileResponse(
+                FileRange(open(path, 'rb'), start, length),
+                content_type=content_type
+            )
+        else:
+            response = FileResponse(
+                open(path, 'rb'), content_type=content_type)
+        if byte_range:
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = length
+        response['Accept-Ranges'] = 'bytes'
+        return response
@@ -0,0 +1,32 @@
+"""Pragma profile applied to every new SQLite connection."""
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def get_pragma_statements(pragmas):
+    """Get PRAGMA statements for the profile, rejecting malformed entries."""
+    statements = []
+    for name, value in pragmas.items():
+        value = str(value)
+        if not (PRAGMA_NAME_RE.match(name) and PRAGMA_VALUE_RE.match(value)):
+            raise ValueError(f'Недопустимая настройка SQLite: {name}={value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Tune a new SQLite connection with the SQLITE_PRAGMAS profile."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get(
+        'PRAGMAS', getattr(settings, 'SQLITE_PRAGMAS', {}))
+    with connection.cursor() as cursor:
+        for statement in get_pragma_statements(pragmas):
+            cursor.execute(statement)
@@ -0,0 +1,71 @@
+"""Static files storage that fingerprints and precompresses assets."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html'
+)
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def compress_gzip(content: bytes) -> bytes:
+    # A fixed mtime keeps the output identical between builds.
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_brotli(content: bytes) -> bytes:
+    return brotli.compress(content, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes .gz and, when the brotli package is
+    installed, .br siblings of text assets so they are served precompressed.
+    Until collectstatic is run, unhashed names are used.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Neither in the manifest nor collected yet.
+            return name
+
+    @property
+    def encodings(self):
+        encodings = {'.gz': compress_gzip}
+        if brotli is not None:
+            encodings['.br'] = compress_brotli
+        return encodings
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name, hashed_name in self.hashed_files.items():
+            if not hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            for compressed_name in self.compress(hashed_name):
+                yield name, compressed_name, True
+
+    def compress(self, name: str):
+        """Write compressed siblings of the file that are worth keeping."""
+        with self.open(name) as file:
+            content = file.read()
+        for extension, compress in self.encodings.items():
+            compressed = compress(content)
+            if len(compressed) > len(content) * MIN_COMPRESSION_RATIO:
+                continue
+            compressed_name = name + extension
+            self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.utils.timezone import now
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'status', 'attempts', 'max_attempts', 'run_at',
+        'finished_at', 'created_at'
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    readonly_fields = (
+        'name', 'args', 'kwargs', 'status', 'attempts', 'started_at',
+        'finished_at', 'error', 'created_at'
+    )
+    actions = ('retry',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Перезапустить выбранные задачи')
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, attempts=0, run_at=now(),
+            finished_at=None
+        )
+        self.message_user(request, f'Задач поставлено в очередь: {count}')
@@ -0,0 +1,6 @@
+MAX_NAME_LENGTH = 255
+MAX_STATUS_LENGTH = 16
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_DELAY = 30
+POLL_INTERVAL = 1
+LOCK_TIMEOUT = 60 * 10
@@ -0,0 +1,66 @@
+"""Run queued background jobs in a pool of processes."""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.constants import POLL_INTERVAL
+from jobs.worker import claim_jobs, init_process, run_job
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=2,
+            help='Число процессов; 0 выполняет задачи в этом процессе.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда в очереди не останется готовых задач.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        if options['processes'] > 0:
+            done = self.run_pool(options)
+        else:
+            done = self.run_inline(options)
+        self.stdout.write(self.style.SUCCESS(f'Выполнено задач: {done}'))
+
+    def run_inline(self, options):
+        done = 0
+        while True:
+            pks = claim_jobs(1)
+            if pks:
+                done += run_job(pks[0])
+            elif options['once']:
+                return done
+            else:
+                time.sleep(options['sleep'])
+
+    def run_pool(self, options):
+        processes = options['processes']
+        done = 0
+        running = set()
+        connections.close_all()
+        with ProcessPoolExecutor(
+                processes, initializer=init_process) as pool:
+            while True:
+                for pk in claim_jobs(processes - len(running)):
+                    running.add(pool.submit(run_job, pk))
+                if not running:
+                    if options['once']:
+                        return done
+                    time.sleep(options['sleep'])
+                    continue
+                finished, running = wait(
+                    running, timeout=options['sleep'],
+                    return_when=FIRST_COMPLETED
+                )
+                done += sum(future.result() for future in finished)
@@ -0,0 +1,59 @@
+from django.db import models
+from django.utils.timezone import now
+
+from .constants import DEFAULT_MAX_ATTEMPTS, MAX_NAME_LENGTH, MAX_STATUS_LENGTH
+
+
+class Job(models.Model):
+    """Call of a task queued for a worker."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField(
+        max_length=MAX_NAME_LENGTH, verbose_name='Задача')
+    args = models.JSONField(default=list, verbose_name='Аргументы')
+    kwargs = models.JSONField(
+        default=dict, verbose_name='Именованные аргументы')
+    status = models.CharField(
+        max_length=MAX_STATUS_LENGTH,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток')
+    max_attempts = models.PositiveSmallIntegerField(
+        default=DEFAULT_MAX_ATTEMPTS, verbose_name='Максимум попыток')
+    run_at = models.DateTimeField(
+        default=now, verbose_name='Запустить после')
+    started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Начата')
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Завершена')
+    error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Добавлена')
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=('run_at',),
+                name='job_queue_idx',
+                condition=models.Q(status='queued')
+            ),
+            models.Index(
+                fields=('started_at',),
+                name='job_running_idx',
+                condition=models.Q(status='running')
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,37 @@
+"""Registration and queueing of background tasks."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.timezone import now
+
+from .constants import DEFAULT_MAX_ATTEMPTS
+from .models import Job
+
+REGISTRY = {}
+
+
+def task(func):
+    """Register the function as a task that workers may run."""
+    func.job_name = f'{func.__module__}.{func.__qualname__}'
+    REGISTRY[func.job_name] = func
+    return func
+
+
+def enqueue(func, *args, delay=0, max_attempts=DEFAULT_MAX_ATTEMPTS,
+            **kwargs):
+    """
+    Queue a call of the task with JSON-serializable arguments.
+    With JOBS_EAGER set the task runs at once and nothing is queued.
+    """
+    if REGISTRY.get(getattr(func, 'job_name', None)) is not func:
+        raise ValueError(f'{func!r} не зарегистрирована как задача.')
+    if getattr(settings, 'JOBS_EAGER', False):
+        func(*args, **kwargs)
+        return None
+    return Job.objects.create(
+        name=func.job_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=max_attempts,
+        run_at=now() + timedelta(seconds=delay)
+    )
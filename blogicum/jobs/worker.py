@@ -0,0 +1,86 @@
+"""Claiming and running of queued jobs."""
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+import django
+from django.db import connections
+from django.db.models import F
+from django.utils.timezone import now
+
+from .constants import LOCK_TIMEOUT, RETRY_DELAY
+from .models import Job
+from .queue import REGISTRY
+
+
+def get_task(name: str):
+    """Get the task by name, importing its module when needed."""
+    if name not in REGISTRY:
+        import_module(name.rsplit('.', 1)[0])
+    return REGISTRY[name]
+
+
+def release_stale_jobs():
+    """Return jobs of crashed workers to the queue or fail them."""
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        started_at__lt=now() - timedelta(seconds=LOCK_TIMEOUT)
+    )
+    stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.Status.QUEUED, run_at=now())
+    stale.update(
+        status=Job.Status.FAILED,
+        finished_at=now(),
+        error='Превышено время выполнения.'
+    )
+
+
+def claim_jobs(limit: int):
+    """
+    Mark up to limit due jobs as running and return their ids.
+    A conditional update claims each job so that concurrent workers
+    never run the same job twice, without row locks SQLite lacks.
+    """
+    release_stale_jobs()
+    candidates = Job.objects.filter(
+        status=Job.Status.QUEUED, run_at__lte=now()
+    ).order_by('run_at', 'pk').values_list('pk', flat=True)[:limit]
+    return [
+        pk for pk in list(candidates)
+        if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING,
+            started_at=now(),
+            attempts=F('attempts') + 1
+        )
+    ]
+
+
+def run_job(pk: int) -> bool:
+    """Run the claimed job, then mark it done, retry it later or fail it."""
+    job = Job.objects.get(pk=pk)
+    try:
+        get_task(job.name)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = RETRY_DELAY * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=pk).update(
+                status=Job.Status.QUEUED,
+                run_at=now() + timedelta(seconds=delay),
+                error=error
+            )
+        else:
+            Job.objects.filter(pk=pk).update(
+                status=Job.Status.FAILED, finished_at=now(), error=error)
+        return False
+    Job.objects.filter(pk=pk).update(
+        status=Job.Status.DONE, finished_at=now(), error='')
+    return True
+
+
+def init_process():
+    """Prepare a pool process to run jobs."""
+    django.setup()
+    for connection in connections.all():
+        # Never reuse a database connection inherited from the parent.
+        connection.connection = None
@@ -0,0 +1,121 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_admin_search_uses_token_index(
+        admin_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    post.title = "Закат над заливом"
+    post.save()
+    comment = mixer.blend(
+        "blog.Comment", post=post, text="Красивые закаты бывают осенью"
+    )
+    mixer.blend("blog.Comment", post=post, text="Другой комментарий")
+    location = mixer.blend("blog.Location", name="Финский залив")
+
+    cases = (
+        ("/admin/blog/post/", "закатами", [post.pk]),
+        ("/admin/blog/comment/", "закат осен", [comment.pk]),
+        ("/admin/blog/location/", "финского", [location.pk]),
+        ("/admin/blog/comment/", "рассвет", []),
+    )
+    for url, query, expected in cases:
+        response = admin_client.get(url, {"q": query})
+        assert response.status_code == 200
+        found = sorted(obj.pk for obj in response.context["cl"].result_list)
+        assert found == expected, (
+            f"Убедитесь, что поиск в админке `{url}` по запросу `{query}`"
+            " находит объекты через поисковый индекс."
+        )
+
+
+def test_admin_search_index_follows_deletes(admin_client, mixer, user):
+    from blog.models import SearchToken
+
+    category = mixer.blend("blog.Category", title="Путешествия")
+    category_pk = category.pk
+    assert SearchToken.objects.filter(object_id=category_pk).exists()
+    category.delete()
+    assert not SearchToken.objects.filter(object_id=category_pk).exists()
+
+
+def _changelist_queries(admin_client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.parametrize(
+    "model, url", (("blog.Post", "/admin/blog/post/"),
+                   ("blog.Comment", "/admin/blog/comment/"))
+)
+def test_admin_changelist_query_count_is_fixed(
+        admin_client, mixer, user, published_category, published_location,
+        model, url
+):
+    def blend(n):
+        if model == "blog.Post":
+            return mixer.cycle(n).blend(
+                model, author=mixer.blend(type(user)),
+                category=mixer.blend("blog.Category"),
+                location=mixer.blend("blog.Location"),
+            )
+        return mixer.cycle(n).blend(
+            model, author=mixer.blend(type(user)),
+            post=mixer.blend("blog.Post", author=user),
+        )
+
+    blend(10)
+    ten_rows = _changelist_queries(admin_client, url)
+    for _ in range(9):
+        blend(10)
+    hundred_rows = _changelist_queries(admin_client, url)
+    assert hundred_rows == ten_rows, (
+        f"Убедитесь, что число запросов на странице `{url}` не зависит от"
+        " количества строк в списке."
+    )
+    assert hundred_rows <= 12
+
+
+def test_change_forms_use_autocomplete(
+        admin_client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    mixer.cycle(30).blend("blog.Post", author=user)
+    for url in (
+        f"/admin/blog/comment/{comment.pk}/change/",
+        f"/admin/blog/post/{post.pk}/change/",
+    ):
+        content = admin_client.get(url).content.decode()
+        assert "admin-autocomplete" in content, (
+            f"Убедитесь, что форма `{url}` использует автодополнение"
+            " для связанных объектов."
+        )
+        assert content.count("<option") <= 10
+
+
+def test_autocomplete_endpoints_search_by_index(admin_client, mixer, user):
+    mixer.blend("blog.Post", author=user, title="Горные озёра")
+    cases = (
+        ("post", "горн", 1),
+        ("post", "морск", 0),
+        ("author", user.username[:3], 1),
+    )
+    for field_name, term, expected in cases:
+        response = admin_client.get("/admin/autocomplete/", {
+            "app_label": "blog",
+            "model_name": "comment",
+            "field_name": field_name,
+            "term": term,
+        })
+        assert response.status_code == 200
+        assert len(response.json()["results"]) >= expected
+        if not expected:
+            assert not response.json()["results"]
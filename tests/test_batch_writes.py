@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+from blog.writes import BatchCommitter
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+class RecordingCommitter(BatchCommitter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def commit(self, batch):
+        self.batches.append(len(batch))
+        super().commit(batch)
+
+
+def submit_concurrently(committer, funcs):
+    results = [None] * len(funcs)
+
+    def run(index, func):
+        try:
+            results[index] = committer.submit(func)
+        except Exception as error:
+            results[index] = error
+
+    threads = [
+        threading.Thread(target=run, args=(index, func))
+        for index, func in enumerate(funcs)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_writes_share_a_transaction(mixer, user):
+    from blog.models import Comment
+
+    post = mixer.blend("blog.Post", author=user)
+    committer = RecordingCommitter(batch_delay=0.5)
+    comments = [
+        Comment(post=post, author=user, text=f"Комментарий {number}")
+        for number in range(5)
+    ]
+    submit_concurrently(committer, [comment.save for comment in comments])
+    assert Comment.objects.count() == 5
+    assert len(committer.batches) < 5, (
+        "Убедитесь, что одновременные записи объединяются в одну "
+        "транзакцию."
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 5
+
+
+def test_failed_write_does_not_undo_others(mixer, user):
+    from blog.models import Comment
+
+    post = mixer.blend("blog.Post", author=user)
+
+    def fail():
+        Comment.objects.create(post=post, author=user, text="Откатится")
+        raise ValueError("Ошибка записи")
+
+    good = Comment(post=post, author=user, text="Сохранится")
+    results = submit_concurrently(
+        RecordingCommitter(batch_delay=0.5), [fail, good.save])
+    assert isinstance(results[0], ValueError), (
+        "Убедитесь, что ошибка записи возвращается в запрос."
+    )
+    assert list(Comment.objects.values_list("text", flat=True)) == [
+        "Сохранится"
+    ]
+
+
+def test_views_write_through_committer(settings, user_client, mixer, user):
+    from blog.models import Comment
+
+    settings.BLOG_BATCH_WRITES = True
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=mixer.blend("blog.Category", is_published=True),
+    )
+    response = user_client.post(
+        f"/posts/{post.pk}/comment/", {"text": "Через очередь записи"})
+    assert response.status_code == 302
+    assert Comment.objects.get().text == "Через очередь записи"
+
+
+def test_batch_failure_reaches_every_request(monkeypatch):
+    from blog import writes
+
+    def broken():
+        raise RuntimeError("Соединение потеряно")
+
+    monkeypatch.setattr(writes, "close_old_connections", broken)
+    committer = RecordingCommitter(batch_delay=0.5)
+    results = submit_concurrently(committer, [lambda: 1, lambda: 2])
+    assert all(isinstance(result, RuntimeError) for result in results), (
+        "Убедитесь, что при сбое пакета каждый запрос получает ошибку, "
+        "а не ждёт бесконечно."
+    )
+    monkeypatch.undo()
+    assert committer.submit(lambda: 3) == 3, (
+        "Убедитесь, что поток записи продолжает работу после сбоя."
+    )
+
+
+def test_write_waits_with_timeout(monkeypatch):
+    from concurrent.futures import TimeoutError
+
+    from blog import writes
+
+    monkeypatch.setattr(writes, "WRITE_TIMEOUT", 0.01)
+    committer = BatchCommitter()
+    monkeypatch.setattr(committer, "start", lambda: None)
+    with pytest.raises(TimeoutError):
+        committer.submit(lambda: 1)
+    future, *_ = committer.queue.get()
+    assert future.cancelled(), (
+        "Убедитесь, что запись, не дождавшаяся очереди, отменяется."
+    )
+
+
+def test_started_write_reports_its_outcome(monkeypatch):
+    from time import sleep
+
+    from blog import writes
+
+    monkeypatch.setattr(writes, "WRITE_TIMEOUT", 0.05)
+
+    def slow():
+        sleep(0.3)
+        return 1
+
+    assert BatchCommitter(batch_delay=0).submit(slow) == 1, (
+        "Убедитесь, что начатая запись не отменяется по таймауту, "
+        "а возвращает свой результат."
+    )
@@ -0,0 +1,153 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+def test_counter_follows_comment_writes(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    assert _count(post) == 3, (
+        "Убедитесь, что при создании комментария увеличивается"
+        " счётчик `comment_count` публикации."
+    )
+    comments[0].delete()
+    assert _count(post) == 2, (
+        "Убедитесь, что при удалении комментария уменьшается"
+        " счётчик `comment_count` публикации."
+    )
+
+
+def test_counter_follows_author_deletion(
+        mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post)
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    another_user.delete()
+    assert _count(post) == 1
+
+
+def test_reconcile_command_repairs_drift(
+        mixer, post_with_published_location
+):
+    from blog.models import Post
+
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("reconcile_comment_counts", batch_size=1)
+    assert _count(post) == 2
+
+
+def test_reconcile_command_renews_cached_cards(
+        mixer, post_with_published_location
+):
+    from blog.models import Post
+
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    post.refresh_from_db(fields=["updated_at"])
+    drifted_at = post.updated_at
+    call_command("reconcile_comment_counts")
+    post.refresh_from_db(fields=["updated_at"])
+    assert post.updated_at > drifted_at, (
+        "Убедитесь, что исправленная публикация получает новую версию "
+        "для кеша карточек."
+    )
+
+
+def test_post_deletion_skips_per_comment_work(
+        mixer, user, post_with_published_location,
+        django_assert_max_num_queries
+):
+    from blog.models import Comment, SearchToken
+
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text=f"Комментарий {number}")
+        for number in range(50)
+    )
+    mixer.blend("blog.Comment", post=post, author=user)
+    with django_assert_max_num_queries(30):
+        post.delete()
+    assert not Comment.objects.exists()
+    assert not SearchToken.objects.filter(model="blog.comment").exists(), (
+        "Убедитесь, что поисковые токены комментариев удаляются вместе "
+        "с публикацией."
+    )
+
+
+def test_user_deletion_recounts_other_posts(
+        mixer, user, another_user, post_with_published_location
+):
+    from blog.models import SearchToken
+
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend(
+        "blog.Post", author=another_user, category=post.category,
+        location=post.location, is_published=True,
+    )
+    mixer.blend("blog.Comment", post=post, author=user)
+    another_user.delete()
+    assert _count(post) == 1, (
+        "Убедитесь, что при удалении пользователя пересчитываются "
+        "комментарии публикаций других авторов."
+    )
+    assert SearchToken.objects.filter(model="blog.comment").count() == (
+        SearchToken.objects.filter(
+            model="blog.comment",
+            object_id__in=post.comments.values("pk")).count()
+    )
+
+
+def test_failed_post_deletion_keeps_counting(
+        mixer, post_with_published_location
+):
+    from django.db import transaction
+    from django.db.models.signals import pre_delete
+
+    from blog.models import Post
+
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend("blog.Comment", post=post)
+
+    def refuse(sender, instance, **kwargs):
+        raise RuntimeError
+
+    pre_delete.connect(refuse, sender=Post)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(refuse, sender=Post)
+    comments[0].delete()
+    assert _count(post) == 1, (
+        "Убедитесь, что неудачное удаление публикации не отключает "
+        "пересчёт счётчика `comment_count`."
+    )
+
+
+def test_admin_user_deletion_recounts_other_posts(
+        mixer, admin_client, user, another_user,
+        post_with_published_location
+):
+    from django.contrib.auth import get_user_model
+
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post, author=user)
+    admin_client.post(
+        f"/admin/auth/user/{another_user.pk}/delete/", {"post": "yes"})
+    assert not get_user_model().objects.filter(pk=another_user.pk).exists()
+    assert _count(post) == 1, (
+        "Убедитесь, что при удалении пользователя в админке "
+        "пересчитываются комментарии публикаций других авторов."
+    )
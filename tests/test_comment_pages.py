@@ -0,0 +1,47 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    from blog.constants import COMMENTS_PER_PAGE
+
+    return mixer.cycle(COMMENTS_PER_PAGE * 2 + 3).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+def test_comments_are_paginated(
+        client, post_with_published_location, many_comments
+):
+    from blog.constants import COMMENTS_PER_PAGE
+
+    cache.clear()
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.pk}/")
+    comments = response.context["comments"]
+    assert len(comments) == COMMENTS_PER_PAGE, (
+        "Убедитесь, что на странице публикации выводится ограниченное"
+        " число комментариев."
+    )
+    seen = [comment.pk for comment in comments]
+    while comments.has_next():
+        response = client.get(
+            f"/posts/{post.pk}/comments/?cursor={comments.next_cursor}"
+        )
+        assert response.status_code == 200
+        comments = response.context["comments"]
+        seen.extend(comment.pk for comment in comments)
+    assert seen == [comment.pk for comment in many_comments], (
+        "Убедитесь, что подгрузка комментариев по курсору выводит все"
+        " комментарии по порядку без повторов."
+    )
+
+
+def test_comment_batches_respect_post_visibility(
+        client, mixer, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    assert client.get(f"/posts/{post.pk}/comments/").status_code == 404
@@ -0,0 +1,73 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _urls(post):
+    return (
+        "/",
+        f"/posts/{post.pk}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+
+
+def test_unchanged_pages_answer_not_modified(
+        client, user_client, post_with_published_location
+):
+    for some_client in (client, user_client):
+        for url in _urls(post_with_published_location):
+            etag = some_client.get(url)["ETag"]
+            response = some_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f"Убедитесь, что страница `{url}` отвечает 304 Not Modified,"
+                " если она не изменилась."
+            )
+
+
+def test_changes_renew_validators(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    etags = {url: client.get(url)["ETag"] for url in _urls(post)}
+    mixer.blend("blog.Comment", post=post)
+    for url, etag in etags.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_validators_depend_on_user(
+        client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.pk}/"
+    etag = client.get(url)["ETag"]
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+def test_validators_change_after_login(
+        client, user, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.pk}/"
+    client.force_login(user)
+    client.get(url)
+    etag = client.get(url)["ETag"]
+    client.logout()
+    client.force_login(user)
+    client.get("/")
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что после нового входа страница с формой отдаётся "
+        "заново со свежим CSRF-токеном."
+    )
@@ -0,0 +1,147 @@
+import gzip
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+CSS = b"body { color: black; }\n" * 100
+HASHED = "css/site.0123456789ab.css"
+
+
+@pytest.fixture(autouse=True)
+def roots(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path / "static"
+    settings.MEDIA_ROOT = tmp_path / "media"
+    css = settings.STATIC_ROOT / HASHED
+    css.parent.mkdir(parents=True)
+    css.write_bytes(CSS)
+    (settings.STATIC_ROOT / f"{HASHED}.gz").write_bytes(gzip.compress(CSS))
+    (settings.STATIC_ROOT / "robots.txt").write_bytes(b"User-agent: *\n")
+    (settings.MEDIA_ROOT / "posts").mkdir(parents=True)
+    (settings.MEDIA_ROOT / "posts" / ".secret").write_bytes(b"hidden")
+    (settings.MEDIA_ROOT / "posts" / "upload.png.part").write_bytes(b"\x89")
+    return tmp_path
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_hashed_static_is_immutable(client):
+    response = client.get(f"/static/{HASHED}")
+    assert response.status_code == 200
+    assert body(response) == CSS
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени кешируются навсегда."
+    )
+    assert response["Content-Type"].startswith("text/css")
+    assert response["Content-Length"] == str(len(CSS))
+    assert "Accept-Encoding" in response["Vary"]
+    plain = client.get("/static/robots.txt")
+    assert "immutable" not in plain["Cache-Control"]
+
+
+def test_precompressed_variant_is_chosen(client):
+    response = client.get(
+        f"/static/{HASHED}", HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что клиенту отдаётся заранее сжатая копия файла."
+    )
+    assert gzip.decompress(body(response)) == CSS
+    assert response["Content-Type"].startswith("text/css")
+    refused = client.get(f"/static/{HASHED}", HTTP_ACCEPT_ENCODING="gzip;q=0")
+    assert not refused.has_header("Content-Encoding")
+
+
+def test_brotli_variant_is_preferred(client, roots):
+    brotli = pytest.importorskip("brotli")
+    (roots / "static" / f"{HASHED}.br").write_bytes(brotli.compress(CSS))
+    response = client.get(f"/static/{HASHED}", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response["Content-Encoding"] == "br", (
+        "Убедитесь, что копия brotli выбирается раньше gzip."
+    )
+    assert brotli.decompress(body(response)) == CSS
+
+
+def test_not_modified(client):
+    etag = client.get(f"/static/{HASHED}")["ETag"]
+    response = client.get(f"/static/{HASHED}", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что на условный запрос отдаётся ответ 304."
+    )
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [
+        ("bytes=0-9", 0, 9),
+        ("bytes=10-", 10, len(CSS) - 1),
+        ("bytes=-5", len(CSS) - 5, len(CSS) - 1),
+        ("bytes=5-100000", 5, len(CSS) - 1),
+    ],
+    ids=["closed", "open", "suffix", "clamped"],
+)
+def test_byte_ranges(client, header, start, end):
+    response = client.get(f"/static/{HASHED}", HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        "Убедитесь, что поддерживаются запросы диапазонов байтов."
+    )
+    assert body(response) == CSS[start:end + 1]
+    assert response["Content-Length"] == str(end - start + 1)
+    assert response["Content-Range"] == f"bytes {start}-{end}/{len(CSS)}"
+
+
+def test_unsatisfiable_and_stale_ranges(client):
+    response = client.get(
+        f"/static/{HASHED}", HTTP_RANGE=f"bytes={len(CSS)}-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == f"bytes */{len(CSS)}"
+    stale = client.get(
+        f"/static/{HASHED}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"')
+    assert stale.status_code == 200 and body(stale) == CSS
+
+
+def test_only_whole_files_can_be_sent_with_sendfile(rf):
+    from blogicum.middleware import MediaFilesMiddleware
+
+    middleware = MediaFilesMiddleware(lambda request: None)
+    whole = middleware(rf.get(f"/static/{HASHED}"))
+    part = middleware(rf.get(f"/static/{HASHED}", HTTP_RANGE="bytes=0-9"))
+    assert hasattr(whole.file_to_stream, "fileno")
+    assert not hasattr(part.file_to_stream, "fileno"), (
+        "Убедитесь, что сервер не может отправить файл дальше диапазона."
+    )
+    whole.close()
+    part.close()
+
+
+def test_head_has_no_body(client):
+    response = client.head(f"/static/{HASHED}")
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response["Content-Length"] == str(len(CSS))
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/media/posts/.secret", "/media/../static/robots.txt",
+        "/media/posts/upload.png.part",
+    ],
+)
+def test_hidden_and_outside_files_are_not_served(client, url):
+    assert client.get(url).status_code == 404
+
+
+def test_content_addressed_media_is_immutable(client, roots):
+    name = "posts/ab/cd/" + "ab" * 32 + ".png"
+    path = roots / "media" / name
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    response = client.get(f"/media/{name}")
+    assert response["Content-Type"] == "image/png"
+    assert "immutable" in response["Cache-Control"]
+    rendition = path.with_name("ab" * 32 + ".card.jpg")
+    rendition.write_bytes(b"\xff\xd8\xff")
+    response = client.get(f"/media/{name[:-4]}.card.jpg")
+    assert "immutable" not in response["Cache-Control"]
@@ -0,0 +1,99 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.JOBS_EAGER = True
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+def make_image(name="photo.png", size=(2000, 1000)):
+    content = BytesIO()
+    Image.new("RGB", size, "navy").save(content, "PNG")
+    return SimpleUploadedFile(name, content.getvalue(), "image/png")
+
+
+def test_renditions_are_made_on_upload(mixer, user, media_root):
+    post = mixer.blend("blog.Post", author=user, image=make_image())
+    post.refresh_from_db()
+    assert post.image_size == "2000x1000", (
+        "Убедитесь, что у публикации сохраняется размер изображения."
+    )
+    renditions = post.image_renditions
+    assert (renditions["card"]["width"], renditions["card"]["height"]) == (
+        640, 320
+    )
+    assert (
+        renditions["detail"]["width"], renditions["detail"]["height"]
+    ) == (1280, 640)
+    stem = PurePosixPath(post.image.name).stem
+    directory = media_root / PurePosixPath(post.image.name).parent
+    names = {path.name for path in directory.iterdir()}
+    assert {
+        f"{stem}.card.jpg", f"{stem}.card.webp",
+        f"{stem}.detail.jpg", f"{stem}.detail.webp",
+    } <= names, (
+        "Убедитесь, что для изображения создаются копии в JPEG и WebP."
+    )
+
+
+def test_small_images_are_not_upscaled(mixer, user):
+    post = mixer.blend(
+        "blog.Post", author=user, image=make_image(size=(300, 200)))
+    post.refresh_from_db()
+    assert post.image_renditions["detail"]["width"] == 300
+
+
+def test_renditions_are_deleted_with_the_image(mixer, user, media_root):
+    post = mixer.blend("blog.Post", author=user, image=make_image())
+    post.image = None
+    post.save()
+    post.refresh_from_db()
+    assert post.image_size == ""
+    assert post.image_renditions == {}
+    names = {path.name for path in (media_root / "posts").rglob("*")}
+    assert not any(".card." in name or ".detail." in name for name in names)
+
+
+def test_pages_use_renditions(
+        client, mixer, user, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, location=published_location,
+        image=make_image(),
+    )
+    for url in ("/", f"/posts/{post.pk}/"):
+        content = client.get(url).content.decode("utf-8")
+        assert 'type="image/webp"' in content, (
+            f"Убедитесь, что страница `{url}` предлагает копии в WebP."
+        )
+        assert "srcset=" in content and 'width="' in content
+
+
+def test_command_makes_missing_renditions(mixer, user):
+    from blog.models import Post
+
+    post = mixer.blend("blog.Post", author=user, image=make_image())
+    Post.objects.filter(pk=post.pk).update(image_size="")
+    post.refresh_from_db()
+    updated_at = post.updated_at
+    call_command("make_image_renditions")
+    post.refresh_from_db()
+    assert post.image_size == "2000x1000"
+    assert post.updated_at > updated_at, (
+        "Убедитесь, что карточка публикации обновляется после создания "
+        "копий изображения."
+    )
@@ -0,0 +1,142 @@
+import gzip
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.management.commands.import_blog import iter_records
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def import_blog(*args):
+    out = StringIO()
+    call_command("import_blog", *map(str, args), stdout=out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def ndjson_dump(tmp_path):
+    records = [
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Первый", "post": 1, "author": 1,
+            "created_at": "2024-01-01T00:00:00Z"}},
+        {"model": "blog.comment", "pk": 2, "fields": {
+            "text": "Второй", "post": 1, "author": 1,
+            "created_at": "2024-01-02T00:00:00Z"}},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Потоковый импорт", "text": "Текст публикации",
+            "pub_date": "2024-01-01T00:00:00Z", "author": 1,
+            "category": 1, "image": "posts/imported.jpg",
+            "is_published": True, "created_at": "2024-01-01T00:00:00Z"}},
+        {"model": "blog.category", "pk": 1, "fields": {
+            "title": "Импорт", "description": "Загруженная категория",
+            "slug": "imported", "is_published": True,
+            "created_at": "2024-01-01T00:00:00Z"}},
+        {"model": "sessions.session", "pk": "skipped", "fields": {}},
+        {"model": "auth.user", "pk": 1, "fields": {
+            "username": "importer", "password": "!"}},
+    ]
+    path = tmp_path / "dump.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as dump:
+        for record in records:
+            dump.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def test_records_are_read_incrementally():
+    text = '[{"a": "[1, 2]"},\n {"b": {"c": 3}}]'
+    stream = StringIO(text)
+    assert list(iter_records(stream, read_size=4)) == [
+        {"a": "[1, 2]"}, {"b": {"c": 3}}
+    ], "Убедитесь, что объекты JSON читаются по частям."
+
+
+def test_broken_json_is_reported():
+    with pytest.raises(CommandError):
+        list(iter_records(StringIO('[{"a": 1}, {"b": '), read_size=4))
+
+
+def test_db_json_is_imported():
+    from blog.models import Category, Location, Post, SearchDocument, User
+
+    output = import_blog(DB_JSON, "--batch-size", "5")
+    assert "в секунду" in output, (
+        "Убедитесь, что команда сообщает скорость загрузки."
+    )
+    assert Category.objects.count() == 6
+    assert Location.objects.count() == 12
+    assert User.objects.count() == 4
+    assert Post.objects.count() == 39, (
+        "Убедитесь, что публикации загружаются после своих авторов."
+    )
+    assert SearchDocument.objects.count() == 39
+
+
+def test_ndjson_dump_in_any_order(ndjson_dump):
+    from blog.models import Comment, Post
+
+    import_blog(ndjson_dump, "--batch-size", "1")
+    post = Post.objects.get()
+    assert post.author.username == "importer"
+    assert Comment.objects.count() == 2
+    assert post.comment_count == 2, (
+        "Убедитесь, что после загрузки счётчики комментариев пересчитаны."
+    )
+
+
+def test_conflicts(ndjson_dump):
+    from blog.models import Comment
+
+    import_blog(ndjson_dump)
+    with pytest.raises(CommandError, match="--ignore-conflicts"):
+        import_blog(ndjson_dump)
+    import_blog(ndjson_dump, "--ignore-conflicts")
+    assert Comment.objects.count() == 2
+
+
+def test_image_references_are_not_counted_twice(ndjson_dump):
+    from blog.models import MediaBlob
+
+    import_blog(ndjson_dump)
+    import_blog(ndjson_dump, "--ignore-conflicts")
+    assert MediaBlob.objects.get(name="posts/imported.jpg").references == 1, (
+        "Убедитесь, что повторная загрузка не увеличивает число ссылок "
+        "на изображение."
+    )
+
+
+def test_cached_pages_show_imported_posts(client, ndjson_dump):
+    cached = client.get("/")
+    etag = cached.get("ETag")
+    import_blog(ndjson_dump)
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag or "*")
+    assert response.status_code == 200
+    assert "Потоковый импорт" in response.content.decode("utf-8"), (
+        "Убедитесь, что после загрузки кеш страниц сбрасывается."
+    )
+
+
+def test_dump_timestamps_are_kept(ndjson_dump):
+    from datetime import datetime, timezone
+
+    from blog.models import Category, Comment, Post
+
+    import_blog(ndjson_dump)
+    assert list(Comment.objects.order_by("created_at").values_list(
+        "text", "created_at")) == [
+        ("Первый", datetime(2024, 1, 1, tzinfo=timezone.utc)),
+        ("Второй", datetime(2024, 1, 2, tzinfo=timezone.utc)),
+    ], "Убедитесь, что даты создания из дампа сохраняются."
+    post = Post.objects.get()
+    assert post.created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert post.updated_at is not None
+    assert Category.objects.get().created_at.year == 2024
+    assert Category._meta.get_field("created_at").auto_now_add, (
+        "Убедитесь, что после загрузки поля дат снова заполняются сами."
+    )
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from jobs.models import Job
+from jobs.queue import enqueue, task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task
+def remember(value):
+    calls.append(value)
+
+
+@task
+def explode():
+    raise RuntimeError("Сбой задачи")
+
+
+@pytest.fixture(autouse=True)
+def clean_state(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    calls.clear()
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def run_worker():
+    call_command("runworker", "--processes", "0", "--once")
+
+
+def test_enqueue_stores_job_for_worker():
+    job = enqueue(remember, 1, delay=60)
+    assert job.status == Job.Status.QUEUED
+    assert job.run_at > timezone.now()
+    run_worker()
+    assert calls == [], "Убедитесь, что отложенная задача не выполняется."
+    Job.objects.update(run_at=timezone.now())
+    run_worker()
+    job.refresh_from_db()
+    assert calls == [1]
+    assert job.status == Job.Status.DONE and job.attempts == 1
+
+
+def test_eager_mode_runs_task_at_once(settings):
+    settings.JOBS_EAGER = True
+    assert enqueue(remember, 2) is None
+    assert calls == [2] and not Job.objects.exists()
+
+
+def test_only_tasks_can_be_queued():
+    with pytest.raises(ValueError):
+        enqueue(print, "не задача")
+
+
+def test_failed_job_is_retried_then_failed():
+    job = enqueue(explode, max_attempts=2)
+    run_worker()
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED, (
+        "Убедитесь, что упавшая задача возвращается в очередь."
+    )
+    assert job.run_at > timezone.now() and "Сбой задачи" in job.error
+    Job.objects.update(run_at=timezone.now())
+    run_worker()
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED and job.attempts == 2
+
+
+def test_stale_running_job_is_released():
+    job = enqueue(remember, 3)
+    Job.objects.update(
+        status=Job.Status.RUNNING, attempts=1,
+        started_at=timezone.now() - timedelta(days=1),
+    )
+    run_worker()
+    job.refresh_from_db()
+    assert calls == [3] and job.status == Job.Status.DONE
+
+
+def test_image_renditions_are_made_by_worker(mixer, user):
+    content = BytesIO()
+    Image.new("RGB", (800, 600), "teal").save(content, "PNG")
+    post = mixer.blend(
+        "blog.Post", author=user,
+        image=SimpleUploadedFile("queued.png", content.getvalue()),
+    )
+    post.refresh_from_db()
+    assert post.image_size == "", (
+        "Убедитесь, что копии изображения создаются вне запроса."
+    )
+    assert Job.objects.filter(name__endswith="make_post_renditions").exists()
+    run_worker()
+    post.refresh_from_db()
+    assert post.image_size == "800x600"
+
+
+def test_admin_lists_jobs(admin_client):
+    job = enqueue(explode)
+    response = admin_client.get("/admin/jobs/job/")
+    assert response.status_code == 200
+    assert job.name in response.content.decode("utf-8")
+    admin_client.post("/admin/jobs/job/", {
+        "action": "retry", "_selected_action": [job.pk],
+    })
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED and job.attempts == 0
@@ -0,0 +1,140 @@
+from hashlib import sha256
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def content():
+    data = BytesIO()
+    Image.new("RGB", (64, 48), "olive").save(data, "PNG")
+    return data.getvalue()
+
+
+def blend_post(mixer, user, content, name="photo.PNG"):
+    return mixer.blend(
+        "blog.Post", author=user, image=SimpleUploadedFile(name, content))
+
+
+def stored_files(media_root):
+    return sorted(
+        str(path.relative_to(media_root).as_posix())
+        for path in (media_root / "posts").rglob("*.png")
+    )
+
+
+def test_identical_uploads_share_one_file(mixer, user, content, media_root):
+    from blog.models import MediaBlob
+
+    first = blend_post(mixer, user, content, "first.png")
+    second = blend_post(mixer, user, content, "second.PNG")
+    digest = sha256(content).hexdigest()
+    name = f"posts/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert first.image.name == second.image.name == name, (
+        "Убедитесь, что файлы изображений называются по хешу содержимого "
+        "и раскладываются по вложенным каталогам."
+    )
+    assert stored_files(media_root) == [name]
+    assert MediaBlob.objects.get(name=first.image.name).references == 2
+
+
+def test_unreferenced_file_is_collected(mixer, user, content, media_root):
+    from blog.models import MediaBlob
+    from jobs.models import Job
+
+    first = blend_post(mixer, user, content)
+    second = blend_post(mixer, user, content)
+    first.delete()
+    assert stored_files(media_root), (
+        "Убедитесь, что файл не удаляется, пока на него ссылаются."
+    )
+    second.delete()
+    assert MediaBlob.objects.get().references == 0
+    Job.objects.update(run_at=timezone.now())
+    call_command("runworker", "--processes", "0", "--once")
+    assert stored_files(media_root) == [], (
+        "Убедитесь, что файлы без ссылок удаляются."
+    )
+    assert not MediaBlob.objects.exists()
+
+
+def test_replaced_image_is_released(mixer, user, content, settings):
+    from blog.models import MediaBlob
+
+    settings.JOBS_EAGER = True
+    post = blend_post(mixer, user, content)
+    old_name = post.image.name
+    data = BytesIO()
+    Image.new("RGB", (64, 48), "plum").save(data, "PNG")
+    post.image = SimpleUploadedFile("new.png", data.getvalue())
+    post.save()
+    assert not MediaBlob.objects.filter(name=old_name).exists()
+    assert not post.image.storage.exists(old_name)
+    assert MediaBlob.objects.get(name=post.image.name).references == 1
+
+
+def test_flat_files_are_moved_to_shards(mixer, user, content, media_root):
+    from blog.models import MediaBlob, Post
+    from jobs.models import Job
+
+    flat = media_root / "posts" / "legacy.png"
+    flat.parent.mkdir()
+    flat.write_bytes(content)
+    (media_root / "posts" / "legacy.card.jpg").write_bytes(b"rendition")
+    posts = mixer.cycle(2).blend("blog.Post", author=user)
+    Post.objects.update(image="posts/legacy.png")
+    MediaBlob.objects.create(name="posts/legacy.png", references=2)
+
+    call_command("shard_media", "--batch-size", "1")
+
+    digest = sha256(content).hexdigest()
+    name = f"posts/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert set(Post.objects.values_list("image", flat=True)) == {name}, (
+        "Убедитесь, что команда переписывает пути изображений публикаций."
+    )
+    assert (media_root / name).with_name(f"{digest}.card.jpg").exists()
+    assert MediaBlob.objects.get(name=name).references == len(posts)
+    assert stored_files(media_root) == [name, "posts/legacy.png"], (
+        "Убедитесь, что исходный файл сохраняется до сборки мусора, "
+        "пока на него могут ссылаться открытые страницы."
+    )
+    Job.objects.update(run_at=timezone.now())
+    call_command("runworker", "--processes", "0", "--once")
+    assert stored_files(media_root) == [name]
+    assert not (media_root / "posts" / "legacy.card.jpg").exists()
+    assert not MediaBlob.objects.filter(name="posts/legacy.png").exists()
+
+
+def test_stale_flat_name_is_kept(mixer, user, content, media_root):
+    from blog.models import MediaBlob, Post
+    from jobs.models import Job
+
+    flat = media_root / "posts" / "legacy.png"
+    flat.parent.mkdir()
+    flat.write_bytes(content)
+    post = mixer.blend("blog.Post", author=user, image="posts/legacy.png")
+
+    call_command("shard_media")
+    stale = Post.objects.get(pk=post.pk)
+    stale.image = "posts/legacy.png"
+    stale.save()
+    Job.objects.update(run_at=timezone.now())
+    call_command("runworker", "--processes", "0", "--once")
+
+    assert flat.exists(), (
+        "Убедитесь, что сохранение старого имени файла из устаревшей "
+        "формы не оставляет публикацию без изображения."
+    )
+    assert MediaBlob.objects.get(name="posts/legacy.png").references == 1
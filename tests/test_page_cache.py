@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location, django_assert_max_num_queries
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.pk}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        first = client.get(url)
+        with django_assert_max_num_queries(2):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша."
+        )
+
+
+def test_authenticated_users_bypass_cache(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    response = user_client.get("/")
+    assert hasattr(response, "context") and response.context is not None
+
+
+def test_writes_purge_affected_pages(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.pk}/"
+    client.get("/")
+    client.get(detail_url)
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+    assert "Обновлённый заголовок" in client.get("/").content.decode()
+
+    comment = mixer.blend("blog.Comment", post=post, text="Новый коммент")
+    assert comment.text in client.get(detail_url).content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы поста."
+    )
+    assert "Комментарии (1)" in client.get("/").content.decode()
+
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(detail_url).status_code == 404
+
+
+def test_writes_purge_pages_again_after_commit(
+        client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    from blog.page_cache import get_page_version_key
+
+    post = post_with_published_location
+    key = get_page_version_key(f"/posts/{post.pk}/")
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.save()
+    version = cache.get(key)
+    assert version is not None
+    for callback in callbacks:
+        callback()
+    assert cache.get(key) != version, (
+        "Убедитесь, что кеш страниц сбрасывается повторно после фиксации "
+        "транзакции, чтобы не остались страницы, собранные до неё."
+    )
+
+
+def test_scheduled_post_limits_cache_timeout(mixer, user):
+    from blog.page_cache import get_timeout
+
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert get_timeout() <= 31
+
+
+def test_post_cards_are_cached_by_version(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    response = user_client.get("/")
+    assert "includes/post_card.html" not in (
+        template.name for template in response.templates
+    ), "Убедитесь, что карточки публикаций берутся из кэша."
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode()
+
+    post.category.title = "Новая категория"
+    post.category.save()
+    assert "Новая категория" in user_client.get("/").content.decode(), (
+        "Убедитесь, что изменение категории обновляет карточки публикаций."
+    )
+
+
+def test_deploy_check_requires_shared_cache(settings, tmp_path):
+    from django.core.checks import run_checks
+
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    ids = {message.id for message in run_checks(
+        include_deployment_checks=True)}
+    assert "blogicum.W001" in ids, (
+        "Убедитесь, что проверка развёртывания предупреждает о кеше, "
+        "который не разделяется между процессами."
+    )
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path)}}
+    ids = {message.id for message in run_checks(
+        include_deployment_checks=True)}
+    assert "blogicum.W001" not in ids
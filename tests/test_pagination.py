@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = N_PER_PAGE * 2 + 5
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    same_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=same_date,
+    )
+
+
+def _walk(client, url, param):
+    seen = []
+    response = client.get(url)
+    while True:
+        page_obj = response.context["page_obj"]
+        seen.extend(post.pk for post in page_obj)
+        cursor = getattr(page_obj, param)
+        if not cursor:
+            return seen, page_obj
+        response = client.get(f"{url}?cursor={cursor}")
+        assert response.status_code == 200
+
+
+def test_cursor_pagination_walks_whole_feed(client, many_posts):
+    expected = sorted((post.pk for post in many_posts), reverse=True)
+    seen, last_page = _walk(client, "/", "next_cursor")
+    assert seen == expected, (
+        "Убедитесь, что постраничная навигация по курсору проходит"
+        " всю ленту без пропусков и повторов, даже если у публикаций"
+        " одинаковая дата."
+    )
+    assert last_page.cursor_based and not last_page.has_next()
+
+    response = client.get(f"/?cursor={last_page.previous_cursor}")
+    previous = [post.pk for post in response.context["page_obj"]]
+    assert previous == expected[N_PER_PAGE:N_PER_PAGE * 2]
+
+
+def test_cursor_pagination_on_category_and_profile(
+        client, many_posts, user, published_category
+):
+    expected = sorted((post.pk for post in many_posts), reverse=True)
+    for url in (
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        seen, _ = _walk(client, url, "next_cursor")
+        assert seen == expected
+
+
+def test_numbered_pages_still_work(client, many_posts):
+    response = client.get("/?page=2")
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+
+
+def test_invalid_cursor_returns_404(client, many_posts):
+    assert client.get("/?cursor=garbage").status_code == 404
+
+
+def test_cursor_past_the_last_post(client, many_posts):
+    from blog.models import Post
+    from blog.utils import encode_cursor
+
+    oldest = Post.objects.order_by("pub_date", "pk").first()
+    response = client.get(f"/?cursor={encode_cursor(oldest)}")
+    assert response.status_code == 200, (
+        "Убедитесь, что курсор после последней публикации не вызывает "
+        "ошибку."
+    )
+    page_obj = response.context["page_obj"]
+    assert len(page_obj) == 0 and not page_obj.has_other_pages()
+
+
+def test_elided_page_range_is_windowed():
+    from django.core.paginator import Paginator
+
+    from blog.utils import get_elided_page_range
+
+    paginator = Paginator(range(N_PER_PAGE * 1000), N_PER_PAGE)
+    ellipsis = Paginator.ELLIPSIS
+    assert get_elided_page_range(paginator.page(500)) == [
+        1, ellipsis, 497, 498, 499, 500, 501, 502, 503, ellipsis, 1000
+    ], (
+        "Убедитесь, что пагинатор выводит первую, последнюю страницу"
+        " и по три страницы вокруг текущей."
+    )
+    assert get_elided_page_range(paginator.page(1)) == [
+        1, 2, 3, 4, ellipsis, 1000
+    ]
+    assert get_elided_page_range(Paginator(range(3), 1).page(2)) == [1, 2, 3]
+
+
+
+def test_feed_count_is_cached_and_invalidated(user_client, many_posts):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    cache.clear()
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/?page=2")
+    assert response.context["paginator"].count == N_POSTS
+    assert not any("COUNT(" in query["sql"] for query in queries), (
+        "Убедитесь, что количество публикаций в ленте берётся из кэша."
+    )
+
+    many_posts[0].is_published = False
+    many_posts[0].save()
+    response = user_client.get("/?page=2")
+    assert response.context["paginator"].count == N_POSTS - 1, (
+        "Убедитесь, что кэшированное количество публикаций в ленте"
+        " сбрасывается при снятии публикации."
+    )
+
+
+def test_estimated_count_is_bounded(many_posts, monkeypatch):
+    from blog import utils
+    from blog.models import Post
+
+    monkeypatch.setattr(
+        utils.CachedCountPaginator, "estimate_limit", N_PER_PAGE
+    )
+    paginator = utils.CachedCountPaginator(
+        Post.published_objects.all(), N_PER_PAGE, estimate=True
+    )
+    assert paginator.count == N_PER_PAGE
@@ -0,0 +1,96 @@
+import importlib
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.db.migrations.state import ProjectState
+
+import blogicum.settings
+from blog.operations import RunSQLOnPostgreSQL
+from blogicum.connections import check_persistent_connections
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def reload_settings(monkeypatch):
+    def reload(**environ):
+        for name in (
+            "DB_ENGINE", "DB_HOST", "DB_CONN_MAX_AGE", "DB_REPLICA_HOSTS",
+            "DB_DISABLE_SERVER_SIDE_CURSORS",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(blogicum.settings)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(blogicum.settings)
+
+
+def test_sqlite_is_default(reload_settings):
+    settings = reload_settings()
+    assert settings.DATABASES["default"]["ENGINE"].endswith("sqlite3")
+    assert settings.REPLICA_DATABASES == []
+
+
+def test_postgresql_settings_from_environment(reload_settings):
+    settings = reload_settings(
+        DB_ENGINE="postgresql", DB_HOST="db", DB_CONN_MAX_AGE="120",
+        DB_REPLICA_HOSTS="replica-a, replica-b",
+    )
+    default = settings.DATABASES["default"]
+    assert default["ENGINE"] == "django.db.backends.postgresql"
+    assert default["HOST"] == "db" and default["CONN_MAX_AGE"] == 120, (
+        "Убедитесь, что настройки PostgreSQL берутся из окружения."
+    )
+    assert default["CONN_HEALTH_CHECKS"]
+    assert not default["DISABLE_SERVER_SIDE_CURSORS"]
+    assert settings.REPLICA_DATABASES == ["replica_1", "replica_2"]
+    assert settings.DATABASES["replica_2"]["HOST"] == "replica-b"
+    assert settings.DATABASES["replica_1"]["TEST"] == {"MIRROR": "default"}
+
+
+def test_postgresql_operation_is_skipped_on_sqlite():
+    operation = RunSQLOnPostgreSQL(
+        "CREATE INDEX broken ON missing_table ((x COLLATE \"C\"));",
+        reverse_sql="DROP INDEX broken;",
+    )
+    state = ProjectState()
+    editor = mock.Mock(connection=connection)
+    operation.database_forwards("blog", editor, state, state)
+    operation.database_backwards("blog", editor, state, state)
+    assert not editor.execute.called, (
+        "Убедитесь, что индексы PostgreSQL не создаются в SQLite."
+    )
+
+
+def test_unusable_connection_is_closed_before_request(monkeypatch):
+    connection.ensure_connection()
+    monkeypatch.setitem(connection.settings_dict, "CONN_HEALTH_CHECKS", True)
+    monkeypatch.setattr(connection, "in_atomic_block", False)
+    with mock.patch.object(
+        connection, "is_usable", return_value=False
+    ), mock.patch.object(connection, "close") as close:
+        check_persistent_connections()
+    assert close.called, (
+        "Убедитесь, что оборванное соединение закрывается перед запросом."
+    )
+
+
+def test_usable_connection_is_kept(monkeypatch):
+    connection.ensure_connection()
+    monkeypatch.setitem(connection.settings_dict, "CONN_HEALTH_CHECKS", True)
+    monkeypatch.setattr(connection, "in_atomic_block", False)
+    with mock.patch.object(connection, "close") as close:
+        check_persistent_connections()
+    assert not close.called
+
+
+def test_prefix_filter_finds_users(admin_client, django_user_model):
+    django_user_model.objects.create(username="prefixed_author")
+    django_user_model.objects.create(username="other_author")
+    content = admin_client.get(
+        "/admin/auth/user/", {"q": "prefixed"}).content.decode("utf-8")
+    assert "prefixed_author" in content and "other_author" not in content
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN_TABLES = ("blog_post", "blog_comment")
+
+
+def _plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _assert_indexed(queryset, name):
+    if connection.vendor != "sqlite":
+        pytest.skip("Планы запросов проверяются только на SQLite.")
+    plan = _plan(queryset)
+    for step in plan:
+        assert "TEMP B-TREE" not in step, (
+            f"Запрос `{name}` сортирует результат во временном B-дереве:"
+            f" {plan}"
+        )
+        for table in FULL_SCAN_TABLES:
+            assert step not in (f"SCAN {table}", f"SCAN TABLE {table}"), (
+                f"Запрос `{name}` полностью сканирует таблицу `{table}`:"
+                f" {plan}"
+            )
+
+
+def test_feed_uses_index(published_category):
+    from blog.models import Post
+
+    _assert_indexed(
+        Post.published_objects.order_by("-pub_date", "-pk")[:11], "feed"
+    )
+
+
+def test_category_feed_uses_index(published_category):
+    from blog.models import Post
+
+    _assert_indexed(
+        Post.published_objects.filter(
+            category__slug=published_category.slug
+        ).order_by("-pub_date", "-pk")[:11],
+        "category feed",
+    )
+
+
+def test_author_feeds_use_index(user):
+    from blog.models import Post
+
+    _assert_indexed(
+        Post.published_objects.get_all_for_user(user).order_by(
+            "-pub_date", "-pk"
+        )[:11],
+        "published author feed",
+    )
+    _assert_indexed(
+        Post.objects.filter(author=user).order_by("-pub_date", "-pk")[:11],
+        "own author feed",
+    )
+
+
+def test_post_comments_use_index(post_with_published_location):
+    _assert_indexed(
+        post_with_published_location.comments.select_related("author"),
+        "post comments",
+    )
+
+
+def test_cursor_page_uses_index(published_category):
+    from django.db.models import Q
+    from django.utils import timezone
+
+    from blog.models import Post
+
+    pub_date = timezone.now()
+    _assert_indexed(
+        Post.published_objects.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=1)
+        ).order_by("-pub_date", "-pk")[:11],
+        "cursor page",
+    )
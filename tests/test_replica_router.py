@@ -0,0 +1,124 @@
+import pytest
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connections
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    connections.databases["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    with connections["replica"].schema_editor() as editor:
+        for model in apps.get_models():
+            editor.create_model(model)
+    settings.REPLICA_DATABASES = ["replica"]
+    cache.clear()
+    yield "replica"
+    cache.clear()
+    connections["replica"].close()
+    delattr(connections._connections, "replica")
+    del connections.databases["replica"]
+
+
+@pytest.fixture
+def post(mixer, user):
+    return mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=mixer.blend("blog.Category", is_published=True),
+        location=None,
+    )
+
+
+def expire_primary_window():
+    from blogicum.db_router import PRIMARY_UNTIL_KEY
+
+    cache.delete(PRIMARY_UNTIL_KEY)
+
+
+def copy_to_replica(*objects):
+    for obj in objects:
+        obj.save(using="replica", force_insert=True)
+
+
+def test_reads_outside_requests_use_primary(replica, post):
+    from blog.models import Post
+
+    assert Post.objects.filter(pk=post.pk).exists(), (
+        "Убедитесь, что вне запросов чтение идёт с основной базы."
+    )
+
+
+def test_safe_requests_read_from_replica(replica, client, post):
+    expire_primary_window()
+    assert client.get(f"/posts/{post.pk}/").status_code == 404, (
+        "Убедитесь, что запросы на чтение обращаются к реплике."
+    )
+    copy_to_replica(post.author, post.category, post)
+    cache.clear()
+    expire_primary_window()
+    assert client.get(f"/posts/{post.pk}/").status_code == 200
+
+
+def test_reads_stick_to_primary_after_write(replica, user_client, post):
+    from blog.models import Comment
+
+    response = user_client.post(
+        f"/posts/{post.pk}/comment/", {"text": "Свежий комментарий"})
+    assert response.status_code == 302
+    assert "primary_until" in response.cookies, (
+        "Убедитесь, что после записи клиент закрепляется за основной базой."
+    )
+    assert Comment.objects.using("default").exists()
+    response = user_client.get(f"/posts/{post.pk}/")
+    assert response.status_code == 200
+    assert "Свежий комментарий" in response.content.decode("utf-8")
+
+
+def test_expired_stickiness_reads_from_replica(replica, client, post):
+    expire_primary_window()
+    client.cookies["primary_until"] = "0"
+    assert client.get(f"/posts/{post.pk}/").status_code == 404
+
+
+def test_pages_refill_from_primary_after_purge(replica, client, post):
+    from blog.page_cache import purge_pages
+
+    expire_primary_window()
+    assert client.get(f"/posts/{post.pk}/").status_code == 404
+    purge_pages([f"/posts/{post.pk}/"])
+    assert client.get(f"/posts/{post.pk}/").status_code == 200, (
+        "Убедитесь, что после сброса кеша страницы строятся по основной "
+        "базе, а не по отстающей реплике."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batched_write_sticks_to_primary(
+        replica, settings, user_client, post, mixer
+):
+    comment = mixer.blend("blog.Comment", post=post, author=post.author)
+    settings.BLOG_BATCH_WRITES = True
+    response = user_client.post(
+        f"/posts/{post.pk}/edit_comment/{comment.pk}/",
+        {"text": "Через очередь записи"})
+    assert response.status_code == 302
+    assert "primary_until" in response.cookies, (
+        "Убедитесь, что запись через очередь тоже закрепляет клиента за "
+        "основной базой."
+    )
+
+
+def test_purge_keeps_other_reads_on_replica(replica, client, post):
+    from blog.page_cache import purge_pages
+
+    purge_pages([f"/posts/{post.pk}/"])
+    response = client.get("/search/", {"q": post.title})
+    assert response.status_code == 200
+    assert not response.context["page_obj"].paginator.count, (
+        "Убедитесь, что после сброса кеша на основную базу переходит "
+        "только перестроение страниц, а прочие чтения идут с реплики."
+    )
@@ -0,0 +1,63 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    from django.utils import timezone
+
+    def blend(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=is_published,
+            pub_date=timezone.now(),
+            title=title,
+            text=text,
+        )
+
+    return {
+        "one": blend("Прогулка", "Мы гуляли по набережной и видели чайку."),
+        "many": blend(
+            "Чайки над морем", "Чайка, чайки и снова чайки у причала."
+        ),
+        "other": blend("Рецепт", "Пирог с яблоками и корицей."),
+        "hidden": blend(
+            "Секретные чайки", "Чайки чайки чайки.", is_published=False
+        ),
+    }
+
+
+def test_search_ranks_by_relevance(client, searchable_posts):
+    response = client.get("/search/", {"q": "чайка"})
+    assert response.status_code == 200
+    found = [post.pk for post in response.context["page_obj"]]
+    assert found == [
+        searchable_posts["many"].pk, searchable_posts["one"].pk
+    ], (
+        "Убедитесь, что поиск учитывает словоформы, упорядочивает"
+        " результаты по релевантности и не показывает скрытые публикации."
+    )
+    assert "<mark>чайку.</mark>" in response.content.decode()
+
+
+def test_index_follows_post_changes(client, searchable_posts):
+    post = searchable_posts["other"]
+    post.text = "Пирог для чаек."
+    post.save()
+    response = client.get("/search/", {"q": "пирог"})
+    assert [p.pk for p in response.context["page_obj"]] == [post.pk]
+    response = client.get("/search/", {"q": "яблоки"})
+    assert not response.context["page_obj"]
+
+    post.delete()
+    response = client.get("/search/", {"q": "пирог"})
+    assert not response.context["page_obj"]
+
+
+def test_empty_query(client, searchable_posts):
+    response = client.get("/search/")
+    assert response.status_code == 200
+    assert not response.context["page_obj"]
@@ -0,0 +1,35 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_pragmas_are_applied_on_connect(settings):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS[
+            "busy_timeout"], (
+            "Убедитесь, что профиль SQLITE_PRAGMAS применяется при "
+            "подключении к базе."
+        )
+        cursor.execute("PRAGMA temp_store")
+        assert cursor.fetchone()[0] == 2
+
+
+def test_malformed_pragmas_are_rejected():
+    from blogicum.sqlite import get_pragma_statements
+
+    assert get_pragma_statements({"journal_mode": "wal"}) == [
+        "PRAGMA journal_mode = wal"
+    ]
+    with pytest.raises(ValueError):
+        get_pragma_statements({"journal_mode": "wal; DROP TABLE blog_post"})
+
+
+def test_benchmark_compares_profiles(capsys):
+    call_command(
+        "benchmark_sqlite", "--readers", "1", "--writers", "1",
+        "--seconds", "0.2", "--rows", "10",
+    )
+    output = capsys.readouterr().out
+    assert "по умолчанию" in output and "SQLITE_PRAGMAS" in output
@@ -0,0 +1,56 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.template import Context, Template
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command("collectstatic", "--noinput", verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_writes_manifest_and_gzip(static_root):
+    manifest = json.loads((static_root / "staticfiles.json").read_text())
+    hashed = manifest["paths"]["css/bootstrap.min.css"]
+    assert hashed != "css/bootstrap.min.css", (
+        "Убедитесь, что имена статических файлов содержат хеш содержимого."
+    )
+    original = (static_root / hashed).read_bytes()
+    compressed = static_root / f"{hashed}.gz"
+    assert compressed.exists(), (
+        "Убедитесь, что для CSS создаётся сжатая gzip-копия."
+    )
+    assert gzip.decompress(compressed.read_bytes()) == original
+    png = manifest["paths"]["img/logo.png"]
+    assert not (static_root / f"{png}.gz").exists(), (
+        "Убедитесь, что уже сжатые форматы не сжимаются повторно."
+    )
+
+
+def test_collectstatic_writes_brotli(static_root):
+    brotli = pytest.importorskip("brotli")
+    manifest = json.loads((static_root / "staticfiles.json").read_text())
+    hashed = manifest["paths"]["css/bootstrap.min.css"]
+    compressed = static_root / f"{hashed}.br"
+    assert compressed.exists(), (
+        "Убедитесь, что для CSS создаётся сжатая brotli-копия."
+    )
+    assert brotli.decompress(compressed.read_bytes()) == (
+        static_root / hashed).read_bytes()
+    assert compressed.stat().st_size < (static_root / f"{hashed}.gz").stat(
+    ).st_size
+
+
+def test_static_tag_resolves_through_manifest(static_root, settings):
+    settings.DEBUG = False
+    html = Template(
+        "{% load static %}{% static 'css/bootstrap.min.css' %}"
+    ).render(Context())
+    manifest = json.loads((static_root / "staticfiles.json").read_text())
+    assert html == (
+        settings.STATIC_URL + manifest["paths"]["css/bootstrap.min.css"]
+    )
@@ -0,0 +1,114 @@
+from hashlib import sha256
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_image(size=(100, 100), image_format="PNG"):
+    content = BytesIO()
+    Image.new("RGB", size).save(content, image_format)
+    return content.getvalue()
+
+
+def post_data(category, image):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.localtime().strftime("%Y-%m-%dT%H:%M"),
+        "category": category.pk,
+        "image": image,
+    }
+
+
+def test_upload_is_streamed_and_hashed(user):
+    from blog.uploads import ImageUploadHandler
+
+    content = make_image()
+    handler = ImageUploadHandler()
+    handler.new_file("image", "photo.png", "image/png", len(content))
+    for start in range(0, len(content), 16):
+        handler.receive_data_chunk(content[start:start + 16], start)
+    file = handler.file_complete(len(content))
+    assert file.upload_error is None
+    assert hasattr(file, "temporary_file_path"), (
+        "Убедитесь, что загрузка записывается во временный файл на диске."
+    )
+    assert file.sha256 == sha256(content).hexdigest()
+
+
+def test_non_image_is_rejected_by_header(user):
+    from blog.uploads import ImageUploadHandler
+
+    handler = ImageUploadHandler()
+    handler.new_file("image", "photo.png", "image/png", None)
+    handler.receive_data_chunk(b"#!/bin/sh\necho hacked\n", 0)
+    file = handler.file_complete(22)
+    assert file.upload_error == "invalid_image"
+    assert file.read() == b"", (
+        "Убедитесь, что отклонённый файл не сохраняется целиком."
+    )
+
+
+def test_create_post_with_image(user_client, published_category):
+    response = user_client.post("/posts/create/", post_data(
+        published_category,
+        SimpleUploadedFile("photo.png", make_image(), "image/png"),
+    ))
+    assert response.status_code == 302
+    from blog.models import Post
+    assert Post.objects.get().image
+
+
+def test_too_large_upload_is_rejected(
+        user_client, published_category, monkeypatch
+):
+    monkeypatch.setattr("blog.uploads.MAX_IMAGE_BYTES", 1000)
+    response = user_client.post("/posts/create/", post_data(
+        published_category,
+        SimpleUploadedFile("photo.bmp", make_image((300, 300), "BMP")),
+    ))
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что слишком большой файл не принимается."
+    )
+
+
+def test_too_many_pixels_are_rejected_before_decode(
+        user_client, published_category, monkeypatch
+):
+    monkeypatch.setattr("blog.forms.MAX_IMAGE_PIXELS", 100 * 100)
+    content = make_image((200, 200))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Изображение не должно декодироваться.")
+
+    monkeypatch.setattr(Image.Image, "load", fail)
+    response = user_client.post("/posts/create/", post_data(
+        published_category,
+        SimpleUploadedFile("photo.png", content, "image/png"),
+    ))
+    assert response.status_code == 200
+    assert response.context["form"].errors["image"]
+
+
+def test_upload_views_check_csrf(user, published_category):
+    from django.test import Client
+
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = client.post("/posts/create/", post_data(
+        published_category,
+        SimpleUploadedFile("photo.png", make_image(), "image/png"),
+    ))
+    assert response.status_code == 403